@@ -0,0 +1,161 @@
+import pandas as pd
+import multiprocessing
+import argparse
+import queue
+import time
+import datetime
+
+# Compara os backends de inferência do BART (torch fp32, int8 e ONNX Runtime) em um conjunto fixo de artigos.
+# A referência é a saída do summarize_text atual (torch fp32, um artigo por vez).
+#
+# Uso: python benchmark_resumo.py [--arquivo Notícias_Resumidas.csv] [--n 20] [--backends torch int8 onnx]
+
+BACKENDS = ["torch", "int8", "onnx"]
+
+def debug(message):
+    print(f"[DEBUG] {message}")
+
+def carregar_artigos(arquivo, n):
+    """Primeiros n artigos em inglês do arquivo, sempre na mesma ordem"""
+    df = pd.read_csv(arquivo)
+    artigos = df['artigo_ingles'].dropna()
+    artigos = artigos[artigos.str.strip() != ""]
+    return artigos.head(n).tolist()
+
+def memoria_atual_mb():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        return None
+
+def rodar_backend(backend, artigos, fila):
+    """Executa em processo próprio para que a memória de um backend não contamine o outro"""
+    import summarizer
+
+    summarizer.backend_resumo = backend
+    memoria_inicial = memoria_atual_mb()
+
+    inicio_carga = time.perf_counter()
+    summarizer.load_summarization_model()
+    tempo_carga = time.perf_counter() - inicio_carga
+    memoria_modelo = memoria_atual_mb()
+
+    resumos = []
+    latencias = []
+    for texto in artigos:
+        inicio = time.perf_counter()
+        resumos.append(summarizer.summarize_text(texto, summarizer.min_tokens, summarizer.max_tokens))
+        latencias.append(time.perf_counter() - inicio)
+
+    memoria_final = memoria_atual_mb()
+    fila.put({
+        'backend': backend,
+        'resumos': resumos,
+        'latencias': latencias,
+        'tempo_carga': tempo_carga,
+        'memoria_modelo': memoria_modelo - memoria_inicial if memoria_modelo is not None else None,
+        'memoria_pico': max(memoria_modelo, memoria_final) if memoria_final is not None else None,
+    })
+
+def lcs(a, b):
+    """Tamanho da maior subsequência comum entre duas listas de tokens"""
+    anterior = [0] * (len(b) + 1)
+    for x in a:
+        atual = [0]
+        for j, y in enumerate(b, 1):
+            atual.append(anterior[j - 1] + 1 if x == y else max(anterior[j], atual[j - 1]))
+        anterior = atual
+    return anterior[-1]
+
+def f1(acertos, total_candidato, total_referencia):
+    if not acertos:
+        return 0.0
+    precisao = acertos / total_candidato
+    revocacao = acertos / total_referencia
+    return 2 * precisao * revocacao / (precisao + revocacao)
+
+def rouge(candidato, referencia):
+    """ROUGE-1 e ROUGE-L (F1) entre dois textos"""
+    c = candidato.lower().split()
+    r = referencia.lower().split()
+    if not c or not r:
+        return 0.0, 0.0
+    contagem = {}
+    for token in r:
+        contagem[token] = contagem.get(token, 0) + 1
+    unigramas = 0
+    for token in c:
+        if contagem.get(token, 0) > 0:
+            unigramas += 1
+            contagem[token] -= 1
+    return f1(unigramas, len(c), len(r)), f1(lcs(c, r), len(c), len(r))
+
+def executar(backend, artigos):
+    contexto = multiprocessing.get_context("spawn")
+    fila = contexto.Queue()
+    processo = contexto.Process(target=rodar_backend, args=(backend, artigos, fila))
+    processo.start()
+
+    # Espera o resultado sem travar caso o processo filho morra (ex.: dependência ausente)
+    resultado = None
+    while resultado is None and (processo.is_alive() or not fila.empty()):
+        try:
+            resultado = fila.get(timeout=5)
+        except queue.Empty:
+            pass
+    processo.join()
+    if processo.exitcode != 0:
+        debug(f"Backend {backend} terminou com código {processo.exitcode}")
+    return resultado
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos backends de inferência do BART")
+    parser.add_argument("--arquivo", default="Notícias_Resumidas.csv")
+    parser.add_argument("--n", type=int, default=20)
+    parser.add_argument("--backends", nargs="+", default=BACKENDS, choices=BACKENDS)
+    args = parser.parse_args()
+
+    artigos = carregar_artigos(args.arquivo, args.n)
+    debug(f"{len(artigos)} artigos carregados de {args.arquivo}")
+    if not artigos:
+        debug("Nenhum artigo em inglês encontrado. Abortando.")
+        return
+
+    # A referência sempre roda, mesmo que "torch" não esteja na lista
+    backends = ["torch"] + [b for b in args.backends if b != "torch"]
+    resultados = {}
+    for backend in backends:
+        debug(f"Rodando backend {backend}...")
+        resultado = executar(backend, artigos)
+        if resultado:
+            resultados[backend] = resultado
+
+    if "torch" not in resultados:
+        debug("Não foi possível gerar a referência (torch). Abortando.")
+        return
+
+    referencia = resultados["torch"]['resumos']
+    linhas = []
+    for backend, resultado in resultados.items():
+        notas = [rouge(c, r) for c, r in zip(resultado['resumos'], referencia)]
+        latencias = sorted(resultado['latencias'])
+        linhas.append({
+            'backend': backend,
+            'carga_s': round(resultado['tempo_carga'], 2),
+            'latencia_media_s': round(sum(latencias) / len(latencias), 3),
+            'latencia_p50_s': round(latencias[len(latencias) // 2], 3),
+            'memoria_modelo_mb': round(resultado['memoria_modelo'], 1) if resultado['memoria_modelo'] is not None else None,
+            'memoria_pico_mb': round(resultado['memoria_pico'], 1) if resultado['memoria_pico'] is not None else None,
+            'rouge1': round(sum(n[0] for n in notas) / len(notas), 4),
+            'rougeL': round(sum(n[1] for n in notas) / len(notas), 4),
+        })
+
+    tabela = pd.DataFrame(linhas)
+    print(tabela.to_string(index=False))
+    arquivo_saida = f"benchmark_resumo_{datetime.datetime.now().strftime('%d-%m-%Y')}.csv"
+    tabela.to_csv(arquivo_saida, index=False)
+    debug(f"Resultados salvos em {arquivo_saida}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import argparse
+import tracemalloc
+import time
+import datetime
+
+# Compara o cálculo de pares similares em blocos (summarizer.similar_pairs) com a matriz densa N×N
+# usada antes, em embeddings sintéticos com duplicatas plantadas. A memória é o pico medido pelo tracemalloc.
+#
+# Uso: python benchmark_similaridade.py [--tamanhos 100 1000 5000 20000] [--bloco 2048] [--max-denso 5000]
+
+TAMANHOS = [100, 500, 1000, 2000, 5000, 10000, 20000]
+DIMENSAO = 384  # Mesma dimensão do all-MiniLM-L6-v2
+LIMITE = 0.7
+
+def debug(message):
+    print(f"[DEBUG] {message}")
+
+def gerar_embeddings(n, semente=0):
+    """Vetores aleatórios (quase ortogonais entre si) com ~5% de cópias levemente perturbadas"""
+    rng = np.random.default_rng(semente)
+    embeddings = rng.standard_normal((n, DIMENSAO)).astype(np.float32)
+    copias = rng.choice(n, size=max(1, n // 20), replace=False)
+    originais = rng.integers(0, n, size=len(copias))
+    embeddings[copias] = embeddings[originais] + 0.3 * rng.standard_normal((len(copias), DIMENSAO)).astype(np.float32)
+    return embeddings
+
+def pares_denso(embeddings, limite):
+    """Caminho antigo: matriz completa em float64 e triângulo superior"""
+    normalizados = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    matriz = (normalizados @ normalizados.T).astype(np.float64)
+    return np.nonzero(np.triu(matriz > limite, k=1))
+
+def medir(funcao, *args):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    tempo = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, tempo, pico / (1024 * 1024)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do cálculo de similaridade em blocos")
+    parser.add_argument("--tamanhos", nargs="+", type=int, default=TAMANHOS)
+    parser.add_argument("--bloco", type=int, default=None)
+    parser.add_argument("--max-denso", type=int, default=5000, help="Maior N para rodar também a versão densa")
+    args = parser.parse_args()
+
+    import summarizer
+
+    linhas = []
+    for n in args.tamanhos:
+        embeddings = gerar_embeddings(n)
+        debug(f"N = {n}...")
+
+        (i, j), tempo, pico = medir(summarizer.similar_pairs, embeddings, LIMITE, args.bloco)
+        linha = {'n': n, 'pares': len(i), 'blocos_s': round(tempo, 3), 'blocos_pico_mb': round(pico, 1),
+                 'denso_s': None, 'denso_pico_mb': None}
+
+        if n <= args.max_denso:
+            (di, dj), tempo, pico = medir(pares_denso, embeddings, LIMITE)
+            if set(zip(di.tolist(), dj.tolist())) != set(zip(i.tolist(), j.tolist())):
+                debug(f"Aviso: pares diferentes entre as versões para N = {n}")
+            linha['denso_s'] = round(tempo, 3)
+            linha['denso_pico_mb'] = round(pico, 1)
+        linhas.append(linha)
+
+    tabela = pd.DataFrame(linhas)
+    print(tabela.to_string(index=False))
+    arquivo_saida = f"benchmark_similaridade_{datetime.datetime.now().strftime('%d-%m-%Y')}.csv"
+    tabela.to_csv(arquivo_saida, index=False)
+    debug(f"Resultados salvos em {arquivo_saida}")
+
+if __name__ == "__main__":
+    main()
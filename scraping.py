@@ -4,213 +4,962 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
+from lxml import html as lxml_html
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import asyncio
+import aiohttp
+import sqlite3
+import hashlib
+import re
+import threading
+import queue
+import os
 import time
-import random
 import datetime
 
 inicio = datetime.datetime.now()
+
+# Parâmetros da coleta paralela das seções
+WORKERS_SECOES = 3              # Seções coletadas ao mesmo tempo
+
+# Limitador adaptativo por host (token bucket com ajuste AIMD)
+TAXA_INICIAL_HOST = 2.0         # Requisições por segundo no início da execução
+TAXA_MINIMA_HOST = 0.25
+TAXA_MAXIMA_HOST = 10.0
+RAJADA_HOST = 2                 # Requisições que podem sair de uma vez após um período ocioso
+AUMENTO_TAXA_HOST = 0.25        # Aumento aditivo a cada resposta saudável
+REDUCAO_TAXA_HOST = 0.5         # Fator multiplicativo em timeout, 429 ou 5xx
+LATENCIA_SAUDAVEL = 3.0         # Segundos; respostas mais lentas não aumentam a taxa
+
+# Parâmetros do pool de navegadores
+TAMANHO_POOL = WORKERS_SECOES   # Navegadores mantidos abertos durante a execução
+MAX_USOS_DRIVER = 50    # Após esse número de usos o navegador é reciclado
+TIMEOUT_POOL = 120      # Segundos esperando um navegador livre antes de desistir
+
+# Parâmetros da coleta HTTP (sem navegador) dos artigos
+CONCORRENCIA_HTTP = 8   # Requisições simultâneas
+TIMEOUT_HTTP = 15       # Segundos por requisição
+HEADERS_HTTP = {
+    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                   "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"),
+    "Accept-Language": "pt-BR,pt;q=0.9",
+}
+
+# Seletores (XPath) por tipo de página. Os campos dos itens são relativos a cada item da listagem
+SELETORES = {
+    "agrotimes": {
+        "espera": '//*[@id="ultimas-home"]',
+        "itens": '//*[@id="ultimas-home"]/div',
+        "link": './div/h2/a',
+        "data": './div/div[2]/span',
+        "max_itens": 20,
+    },
+    "moneytimes": {
+        "espera": '//main',
+        "itens": '//main/div/div',
+        "link": './div/h2/a',
+        "data": './div/div[2]/span',
+        "max_itens": 10,
+    },
+    "artigo": {
+        "espera": '//article/div[2]/div/div[1]/div[2]/div[2]/span[1]',
+        "data": '//article/div[2]/div/div[1]/div[2]/div[2]/span[1]',
+        "paragrafos": '//article/div[3]/div[1]/div[1]/p',
+    },
+}
+
+# Índice persistente dos artigos já coletados em execuções anteriores
+ARQUIVO_INDICE = "artigos_vistos.sqlite"
+
+# Janela máxima de coleta; o writer descarta notícias mais antigas que isso de qualquer forma
+JANELA_MAXIMA = datetime.timedelta(days=1)
+
+# Cache em disco do HTML bruto das listagens e artigos
+PASTA_CACHE = "cache_html"
+TTL_LISTAGEM = 15 * 60                  # Segundos até uma listagem precisar ser recarregada
+TTL_ARTIGO = 24 * 60 * 60               # Segundos até um artigo precisar ser revalidado
+IDADE_MAXIMA_CACHE = 7 * 24 * 60 * 60   # Entradas mais antigas que isso são removidas
+TAMANHO_MAXIMO_CACHE = 200 * 1024 * 1024  # Bytes; acima disso remove as menos usadas
+# NEURON_REPLAY=1 usa apenas o cache, sem acessar a rede (útil para reprocessar e testar)
+MODO_REPLAY = os.environ.get("NEURON_REPLAY") == "1"
+
 # Função de debug
 def debug(message):
     print(f"[DEBUG] {message}")
 
 # Configuração do WebDriver Manager
+# CHROMEDRIVER_PATH permite apontar para um driver já baixado e evitar a consulta à rede
+_chromedriver_path = os.environ.get("CHROMEDRIVER_PATH")
+_chromedriver_lock = threading.Lock()
+
+def chromedriver_path():
+    """Resolve o caminho do chromedriver uma única vez por execução"""
+    global _chromedriver_path
+    with _chromedriver_lock:
+        if _chromedriver_path is None:
+            _chromedriver_path = ChromeDriverManager().install()
+        return _chromedriver_path
+
 def setup_driver():
-    service = Service(ChromeDriverManager().install())
+    service = Service(chromedriver_path())
     options = webdriver.ChromeOptions()
     options.add_argument("--disable-blink-features=AutomationControlled")
     options.add_argument("--start-maximized")
     return webdriver.Chrome(service=service, options=options)
 
-### SCRAPPING DO AGROTIMES ###
-def collect_links_and_titles_until_limit(driver):
-    data = []
-    debug("Iniciando coleta de links e títulos até data_limit.")
-    
-    for x in range(1, 21):
-        try:
-            link_element = driver.find_element(By.XPATH, f'//*[@id="ultimas-home"]/div[{x}]/div/h2/a')
-            link = link_element.get_attribute("href")
-            title = link_element.text
+### POOL DE NAVEGADORES ###
+class DriverPool:
+    """Mantém navegadores aquecidos e os empresta para as etapas de scraping"""
+
+    def __init__(self, tamanho=TAMANHO_POOL, max_usos=MAX_USOS_DRIVER):
+        self.tamanho = tamanho
+        self.max_usos = max_usos
+        self._livres = queue.Queue()
+        self._usos = {}
+        self._criados = 0
+        self._lock = threading.Lock()
+        self._fechado = False
+
+    def aquecer(self):
+        """Abre de antemão todos os navegadores do pool.
+
+        Se um deles falhar, para de aquecer e segue com os já abertos; os demais são abertos sob demanda
+        (e a coleta via HTTP não depende do navegador).
+        """
+        debug(f"Iniciando pool com {self.tamanho} navegador(es)...")
+        while True:
+            with self._lock:
+                if self._criados >= self.tamanho:
+                    break
+                self._criados += 1
+            try:
+                self._livres.put(self._repor())
+            except Exception as e:
+                debug(f"Aviso: falha ao abrir navegador no aquecimento do pool: {str(e)}")
+                break
 
-            date_element = driver.find_element(By.XPATH, f'//*[@id="ultimas-home"]/div[{x}]/div/div[2]/span')
-            date_text = date_element.text
-            debug(f"Data encontrada em x={x}: {date_text}")
+    def _novo_driver(self):
+        driver = setup_driver()
+        with self._lock:
+            self._usos[id(driver)] = 0
+        return driver
 
-            if "dia(s) atrás" in date_text:
-                debug("Data_limit encontrada. Parando coleta nesta página.")
-                return data
+    def _repor(self):
+        """Abre um navegador para uma vaga já reservada em _criados; se falhar, libera a vaga"""
+        try:
+            return self._novo_driver()
+        except Exception:
+            with self._lock:
+                self._criados -= 1
+            raise
+
+    def _obter(self):
+        limite = time.monotonic() + TIMEOUT_POOL
+        while True:
+            try:
+                return self._livres.get_nowait()
+            except queue.Empty:
+                pass
+
+            # Só abre um navegador novo se o pool ainda não estiver completo
+            with self._lock:
+                criar = self._criados < self.tamanho
+                if criar:
+                    self._criados += 1
+            if criar:
+                return self._repor()
+
+            # Espera em intervalos curtos para notar vagas liberadas por navegadores que falharam
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                raise RuntimeError(f"Nenhum navegador livre após {TIMEOUT_POOL}s")
+            try:
+                return self._livres.get(timeout=min(1.0, restante))
+            except queue.Empty:
+                pass
 
-            data.append({"Link": link, "Título": title})
+    def _descartar(self, driver):
+        with self._lock:
+            self._usos.pop(id(driver), None)
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
 
-        except NoSuchElementException:
-            debug(f"Elemento não encontrado para x={x}. Parando a coleta nesta página.")
-            break
+    def _saudavel(self, driver):
+        """Verifica se o navegador ainda responde a comandos"""
+        try:
+            return driver.execute_script("return 1") == 1
+        except WebDriverException:
+            return False
+
+    @contextmanager
+    def driver(self):
+        """Empresta um navegador do pool e o devolve ao final do bloco"""
+        if self._fechado:
+            raise RuntimeError("Pool de navegadores já foi encerrado")
+
+        driver = self._obter()
+        if not self._saudavel(driver):
+            debug("Navegador sem resposta. Substituindo por um novo.")
+            self._descartar(driver)
+            driver = self._repor()
 
-    debug(f"Coletados {len(data)} links e títulos nesta página até data_limit.")
-    return data
+        try:
+            yield driver
+        finally:
+            self._devolver(driver)
+
+    def _devolver(self, driver):
+        with self._lock:
+            self._usos[id(driver)] = self._usos.get(id(driver), 0) + 1
+            usos = self._usos[id(driver)]
+
+        if self._fechado:
+            self._descartar(driver)
+            with self._lock:
+                self._criados -= 1
+            return
+
+        if usos >= self.max_usos or not self._saudavel(driver):
+            debug(f"Reciclando navegador após {usos} uso(s).")
+            self._descartar(driver)
+            try:
+                driver = self._repor()
+            except Exception as e:
+                # A vaga fica livre para o próximo _obter tentar de novo
+                debug(f"Falha ao abrir navegador substituto: {str(e)}")
+                return
+        else:
+            try:
+                driver.delete_all_cookies()
+            except WebDriverException:
+                pass
 
-def scrape_agrotimes():
-    driver = setup_driver()
-    data_collection = []
-    current_page = 1
-    base_url = "https://www.moneytimes.com.br/agrotimes/"
+        self._livres.put(driver)
 
-    try:
+    def close(self):
+        """Encerra todos os navegadores livres do pool"""
+        self._fechado = True
         while True:
-            driver.get(f"{base_url}page/{current_page}/" if current_page > 1 else base_url)
-            
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.XPATH, '//*[@id="ultimas-home"]'))
+            try:
+                driver = self._livres.get_nowait()
+            except queue.Empty:
+                break
+            self._descartar(driver)
+            with self._lock:
+                self._criados -= 1
+        debug("Pool de navegadores encerrado.")
+
+_pool = None
+
+def get_pool():
+    """Retorna o pool compartilhado, criando-o na primeira chamada"""
+    global _pool
+    if _pool is None:
+        _pool = DriverPool()
+    return _pool
+
+### LIMITE DE REQUISIÇÕES POR HOST ###
+class HostLimiter:
+    """Token bucket por host, compartilhado entre threads, que acelera enquanto o site responde
+    bem e recua (AIMD) em timeouts, 429 e 5xx"""
+
+    def __init__(self, taxa_inicial=TAXA_INICIAL_HOST, rajada=RAJADA_HOST):
+        self.taxa_inicial = taxa_inicial
+        self.rajada = rajada
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _estado(self, url):
+        host = urlsplit(url).netloc.lower()
+        if host not in self._hosts:
+            self._hosts[host] = {
+                'taxa': self.taxa_inicial, 'tokens': float(self.rajada), 'atualizado': time.monotonic(),
+                'requisicoes': 0, 'erros': 0, 'latencia_total': 0.0, 'primeira': None, 'ultima': None,
+            }
+        return self._hosts[host]
+
+    def reservar(self, url):
+        """Reserva uma ficha do host e retorna quantos segundos esperar por ela"""
+        with self._lock:
+            estado = self._estado(url)
+            agora = time.monotonic()
+            estado['tokens'] = min(self.rajada, estado['tokens'] + (agora - estado['atualizado']) * estado['taxa'])
+            estado['atualizado'] = agora
+            estado['tokens'] -= 1
+            espera = -estado['tokens'] / estado['taxa'] if estado['tokens'] < 0 else 0.0
+
+            inicio = agora + espera
+            estado['primeira'] = estado['primeira'] if estado['primeira'] is not None else inicio
+            estado['ultima'] = inicio
+        return espera
+
+    def aguardar(self, url):
+        espera = self.reservar(url)
+        if espera > 0:
+            time.sleep(espera)
+
+    def registrar(self, url, latencia=None, status=None, erro=False):
+        """Ajusta a taxa do host a partir do resultado de uma requisição"""
+        with self._lock:
+            estado = self._estado(url)
+            estado['requisicoes'] += 1
+            if latencia is not None:
+                estado['latencia_total'] += latencia
+
+            if erro or status == 429 or (status is not None and status >= 500):
+                estado['erros'] += 1
+                estado['taxa'] = max(TAXA_MINIMA_HOST, estado['taxa'] * REDUCAO_TAXA_HOST)
+                # Descarta as fichas acumuladas para o recuo valer imediatamente
+                estado['tokens'] = min(estado['tokens'], 0.0)
+            elif latencia is not None and latencia <= LATENCIA_SAUDAVEL:
+                estado['taxa'] = min(TAXA_MAXIMA_HOST, estado['taxa'] + AUMENTO_TAXA_HOST)
+
+    def metricas(self):
+        """Retorna, por host, requisições, erros, taxa efetiva/atual e latência média"""
+        with self._lock:
+            resultado = {}
+            for host, estado in self._hosts.items():
+                duracao = (estado['ultima'] - estado['primeira']) if estado['primeira'] is not None else 0
+                resultado[host] = {
+                    'requisicoes': estado['requisicoes'],
+                    'erros': estado['erros'],
+                    'taxa_efetiva': estado['requisicoes'] / duracao if duracao > 0 else None,
+                    'taxa_atual': estado['taxa'],
+                    'latencia_media': estado['latencia_total'] / estado['requisicoes'] if estado['requisicoes'] else None,
+                }
+            return resultado
+
+    def relatorio(self):
+        for host, m in self.metricas().items():
+            efetiva = f"{m['taxa_efetiva']:.2f} req/s" if m['taxa_efetiva'] else "n/d"
+            latencia = f"{m['latencia_media']:.2f}s" if m['latencia_media'] is not None else "n/d"
+            debug(f"{host}: {m['requisicoes']} requisições, {m['erros']} erros, taxa efetiva {efetiva}, "
+                  f"taxa final {m['taxa_atual']:.2f} req/s, latência média {latencia}")
+
+host_limiter = HostLimiter()
+
+### ÍNDICE DE ARTIGOS JÁ COLETADOS ###
+def canonical_url(link):
+    """Normaliza o link (esquema/host em minúsculas, sem fragmento, barra final ou parâmetros utm_)"""
+    partes = urlsplit(link.strip())
+    query = sorted((k, v) for k, v in parse_qsl(partes.query) if not k.lower().startswith("utm_"))
+    caminho = partes.path.rstrip('/') or '/'
+    return urlunsplit((partes.scheme.lower(), partes.netloc.lower(), caminho, urlencode(query), ''))
+
+class ArticleIndex:
+    """Índice SQLite dos artigos já baixados, chaveado pela URL canônica"""
+
+    def __init__(self, caminho=ARQUIVO_INDICE):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(caminho, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS artigos (
+                url TEXT PRIMARY KEY,
+                link TEXT,
+                obtido_em TEXT,
+                data TEXT,
+                artigo TEXT
             )
+        """)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (chave TEXT PRIMARY KEY, valor TEXT)")
+        self._conn.commit()
+
+    def get_watermark(self, secao=None):
+        """Início da última execução concluída sem falhas para a seção, ou None se nunca houve uma.
+
+        Seções sem watermark próprio usam o watermark geral das versões anteriores, se existir.
+        """
+        chaves = [f"watermark:{secao}", "watermark"] if secao else ["watermark"]
+        with self._lock:
+            for chave in chaves:
+                linha = self._conn.execute("SELECT valor FROM meta WHERE chave = ?", (chave,)).fetchone()
+                if linha:
+                    return datetime.datetime.fromisoformat(linha[0])
+        return None
+
+    def set_watermark(self, momento, secao=None):
+        chave = f"watermark:{secao}" if secao else "watermark"
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (chave, valor) VALUES (?, ?)",
+                (chave, momento.isoformat(timespec="seconds"))
+            )
+            self._conn.commit()
+
+    def buscar(self, links):
+        """Retorna {link: {'Data', 'Artigo'}} para os links já presentes no índice"""
+        chaves = {canonical_url(link): link for link in links if isinstance(link, str)}
+        encontrados = {}
+        with self._lock:
+            for url, link in chaves.items():
+                linha = self._conn.execute(
+                    "SELECT data, artigo FROM artigos WHERE url = ?", (url,)
+                ).fetchone()
+                if linha:
+                    encontrados[link] = {'Data': linha[0], 'Artigo': linha[1]}
+        return encontrados
+
+    def salvar(self, link, resultado):
+        """Registra um artigo baixado com sucesso"""
+        if not resultado or not resultado.get('Artigo'):
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO artigos (url, link, obtido_em, data, artigo) VALUES (?, ?, ?, ?, ?)",
+                (canonical_url(link), link, datetime.datetime.now().isoformat(timespec="seconds"),
+                 resultado['Data'], resultado['Artigo'])
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+_indice = None
+
+def get_index():
+    """Retorna o índice compartilhado, abrindo-o na primeira chamada"""
+    global _indice
+    if _indice is None:
+        _indice = ArticleIndex()
+    return _indice
+
+### CACHE DE RESPOSTAS ###
+class ResponseCache:
+    """Cache em disco do HTML por URL, com validadores HTTP, TTL e limite de tamanho"""
+
+    def __init__(self, pasta=PASTA_CACHE):
+        self.pasta = pasta
+        os.makedirs(pasta, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(pasta, "indice.sqlite"), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS respostas (
+                chave TEXT PRIMARY KEY,
+                url TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                obtido_em REAL,
+                acessado_em REAL,
+                tamanho INTEGER
+            )
+        """)
+        self._conn.commit()
+
+    def _chave(self, url):
+        return hashlib.sha1(canonical_url(url).encode("utf-8")).hexdigest()
+
+    def _arquivo(self, chave):
+        return os.path.join(self.pasta, f"{chave}.html")
+
+    def get(self, url):
+        """Retorna {'html', 'etag', 'last_modified', 'idade'} ou None se a URL não estiver no cache"""
+        chave = self._chave(url)
+        with self._lock:
+            linha = self._conn.execute(
+                "SELECT etag, last_modified, obtido_em FROM respostas WHERE chave = ?", (chave,)
+            ).fetchone()
+            if not linha:
+                return None
+            try:
+                with open(self._arquivo(chave), encoding="utf-8") as arquivo:
+                    html = arquivo.read()
+            except OSError:
+                self._conn.execute("DELETE FROM respostas WHERE chave = ?", (chave,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE respostas SET acessado_em = ? WHERE chave = ?", (time.time(), chave))
+            self._conn.commit()
+        return {'html': html, 'etag': linha[0], 'last_modified': linha[1], 'idade': time.time() - linha[2]}
+
+    def put(self, url, html, etag=None, last_modified=None):
+        chave = self._chave(url)
+        agora = time.time()
+        with self._lock:
+            with open(self._arquivo(chave), "w", encoding="utf-8") as arquivo:
+                arquivo.write(html)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO respostas VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (chave, url, etag, last_modified, agora, agora, len(html.encode("utf-8")))
+            )
+            self._conn.commit()
 
-            new_data = collect_links_and_titles_until_limit(driver)
-            data_collection.extend(new_data)
-
-            if len(new_data) < 20:
-                debug("CABO ESSE SCRAPING")
-                break
+    def touch(self, url):
+        """Marca a entrada como recém-validada (resposta 304)"""
+        with self._lock:
+            self._conn.execute("UPDATE respostas SET obtido_em = ? WHERE chave = ?", (time.time(), self._chave(url)))
+            self._conn.commit()
 
-            current_page += 1
+    def _remover(self, chaves):
+        for chave in chaves:
+            self._conn.execute("DELETE FROM respostas WHERE chave = ?", (chave,))
+            try:
+                os.remove(self._arquivo(chave))
+            except OSError:
+                pass
+
+    def evict(self, idade_maxima=IDADE_MAXIMA_CACHE, tamanho_maximo=TAMANHO_MAXIMO_CACHE):
+        """Remove entradas expiradas e, se preciso, as menos acessadas até caber no limite"""
+        with self._lock:
+            expiradas = [linha[0] for linha in self._conn.execute(
+                "SELECT chave FROM respostas WHERE obtido_em < ?", (time.time() - idade_maxima,)
+            )]
+            self._remover(expiradas)
+
+            excedentes = []
+            total = self._conn.execute("SELECT COALESCE(SUM(tamanho), 0) FROM respostas").fetchone()[0]
+            for chave, tamanho in self._conn.execute("SELECT chave, tamanho FROM respostas ORDER BY acessado_em").fetchall():
+                if total <= tamanho_maximo:
+                    break
+                excedentes.append(chave)
+                total -= tamanho
+            self._remover(excedentes)
+            self._conn.commit()
+
+        if expiradas or excedentes:
+            debug(f"Cache: {len(expiradas)} entradas expiradas e {len(excedentes)} por tamanho removidas.")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+_cache = None
+
+def get_cache():
+    """Retorna o cache compartilhado, abrindo-o na primeira chamada"""
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache()
+    return _cache
+
+### EXTRAÇÃO DO HTML ###
+def _texto(elemento):
+    return " ".join(elemento.text_content().split())
+
+def load_page_source(driver, url, xpath_espera):
+    """Carrega a página no navegador e devolve o HTML renderizado em uma única chamada"""
+    host_limiter.aguardar(url)
+    inicio_requisicao = time.monotonic()
+    try:
+        driver.get(url)
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.XPATH, xpath_espera))
+        )
+    except WebDriverException:
+        # Inclui TimeoutException e falhas de rede do navegador (ERR_CONNECTION_RESET etc.)
+        host_limiter.registrar(url, erro=True)
+        raise
+    host_limiter.registrar(url, time.monotonic() - inicio_requisicao)
+    return driver.page_source
+
+def load_page(url, xpath_espera, ttl, pool=None, valida=None):
+    """Devolve o HTML da página, do cache se ainda estiver válido ou do navegador caso contrário.
+
+    `valida(html)` descarta entradas do cache que não servem (ex.: HTML bruto sem o conteúdo renderizado).
+    Retorna (html, momento em que foi obtido), para que datas relativas ('3 hora(s) atrás') sejam
+    resolvidas em relação ao download e não ao momento da leitura do cache.
+    """
+    cache = get_cache()
+    entrada = cache.get(url)
+    if entrada and (valida is None or valida(entrada['html'])) and (MODO_REPLAY or entrada['idade'] < ttl):
+        return entrada['html'], datetime.datetime.now() - datetime.timedelta(seconds=entrada['idade'])
+    if MODO_REPLAY:
+        raise LookupError(f"Página fora do cache no modo replay: {url}")
+
+    pool = pool or get_pool()
+    with pool.driver() as driver:
+        html = load_page_source(driver, url, xpath_espera)
+    cache.put(url, html)
+    return html, datetime.datetime.now()
+
+def extract_listing(html, url, seletores):
+    """Extrai título, link e data de todos os itens de uma listagem em uma única análise do HTML"""
+    arvore = lxml_html.fromstring(html)
+    arvore.make_links_absolute(url)
+
+    itens = []
+    for item in arvore.xpath(seletores["itens"])[:seletores["max_itens"]]:
+        links = item.xpath(seletores["link"])
+        if not links:
+            continue
+        datas = item.xpath(seletores["data"])
+        itens.append({
+            "Título": _texto(links[0]),
+            "Link": links[0].get("href"),
+            "Data_listagem": _texto(datas[0]) if datas else "ausente",
+        })
+    return itens
+
+### SCRAPING DAS LISTAGENS ###
+MESES = {
+    'jan': 1, 'fev': 2, 'mar': 3, 'abr': 4, 'mai': 5, 'jun': 6,
+    'jul': 7, 'ago': 8, 'set': 9, 'out': 10, 'nov': 11, 'dez': 12,
+}
+
+UNIDADES_RELATIVAS = {
+    'minuto': datetime.timedelta(minutes=1),
+    'hora': datetime.timedelta(hours=1),
+    'dia': datetime.timedelta(days=1),
+    'semana': datetime.timedelta(weeks=1),
+}
+
+def parse_listing_date(texto, agora=None):
+    """Converte a data da listagem ('3 hora(s) atrás', '1 dia(s) atrás', '08 maio 2025, 16:10') em datetime.
+
+    Datas relativas viram o momento mais recente possível (ex.: '3 hora(s) atrás' -> agora - 3h),
+    para que um item no limite nunca seja descartado por arredondamento. Retorna None se não reconhecer.
+    """
+    if not isinstance(texto, str):
+        return None
+    agora = agora or datetime.datetime.now()
+    texto = texto.strip().lower()
+
+    if texto.startswith("agora"):
+        return agora
+
+    relativo = re.search(r'(\d+)\s*(minuto|hora|dia|semana)', texto)
+    if relativo:
+        return agora - int(relativo.group(1)) * UNIDADES_RELATIVAS[relativo.group(2)]
+
+    numerica = re.search(r'(\d{1,2})/(\d{1,2})/(\d{4})(?:\D+(\d{1,2}):(\d{2}))?', texto)
+    if numerica:
+        dia, mes, ano, hora, minuto = numerica.groups()
+        return datetime.datetime(int(ano), int(mes), int(dia), int(hora or 0), int(minuto or 0))
+
+    extenso = re.search(r'(\d{1,2})\s+(?:de\s+)?([a-zç]{3})[a-zç]*\.?\s+(?:de\s+)?(\d{4})(?:\D+(\d{1,2}):(\d{2}))?', texto)
+    if extenso and extenso.group(2) in MESES:
+        dia, mes, ano, hora, minuto = extenso.groups()
+        return datetime.datetime(int(ano), MESES[mes], int(dia), int(hora or 0), int(minuto or 0))
+
+    return None
+
+def collect_links_and_titles_until_limit(itens, watermark=None, agora=None):
+    """Mantém os itens da página até o primeiro publicado antes do watermark (ou fora da janela máxima).
+
+    `agora` é o momento em que a página foi obtida, base das datas relativas e da janela máxima.
+    """
+    agora = agora or datetime.datetime.now()
+    limite = agora - JANELA_MAXIMA
+    if watermark is not None:
+        limite = max(limite, watermark)
 
-    except TimeoutException:
-        debug("Tempo limite excedido ao carregar a página.")
-    finally:
-        driver.quit()
-    
-    df = pd.DataFrame(data_collection)
-    df['Segmentação'] = 'Agronegócio'
-    return df
-
-### FUNÇÃO PRINCIPAL DE SCRAPING ###
-def scrape_moneytimes(url_site, segmentacao):
-    driver = setup_driver()
     data = []
+    for item in itens:
+        publicado = parse_listing_date(item["Data_listagem"], agora)
+        if publicado is not None and publicado <= limite:
+            debug("Data_limit encontrada. Parando coleta nesta página.")
+            return data, True
+        data.append({
+            "Link": item["Link"],
+            "Título": item["Título"],
+            "Publicado_em": publicado.isoformat(timespec="minutes") if publicado else None,
+        })
+
+    debug(f"Coletados {len(data)} links e títulos nesta página até data_limit.")
+    return data, False
+
+def crawl_listing(base_url, site, segmentacao, pool=None, watermark=None):
+    """Percorre as páginas de uma listagem até a data limite ou até uma página incompleta.
+
+    Retorna o DataFrame, se a listagem foi percorrida até o fim sem erros e o momento em que foi obtida
+    a página mais antiga usada (do cache ou do navegador). Só o que foi publicado até esse momento
+    aparece na listagem, então é ele, e não o início da execução, que pode virar o watermark.
+    """
+    seletores = SELETORES[site]
+    data_collection = []
     page = 1
+    completa = False
+    obtida_em = None
 
     try:
         while True:
-            url = f"{url_site}page/{page}/" if page > 1 else url_site
-            driver.get(url)
-            
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.TAG_NAME, 'main'))
-            )
-
-            for x in range(1, 11):
-                try:
-                    title_element = driver.find_element(By.XPATH, f"/html/body/div[8]/main/div/div[{x}]/div/h2/a")
-                    title = title_element.text
-                    link = title_element.get_attribute('href')
-                except:
-                    title = "ausente"
-                    link = "ausente"
+            url = f"{base_url}page/{page}/" if page > 1 else base_url
+            html, obtido_em = load_page(url, seletores["espera"], TTL_LISTAGEM, pool)
+            obtida_em = obtido_em if obtida_em is None else min(obtida_em, obtido_em)
+            itens = extract_listing(html, url, seletores)
 
-                try:
-                    date_element = driver.find_element(By.XPATH, f"/html/body/div[8]/main/div/div[{x}]/div/div[2]/span")
-                    date = date_element.text
-                except:
-                    date = "ausente"
-
-                data.append({"Título": title, "Link": link, "Segmentação": segmentacao})
+            new_data, limite = collect_links_and_titles_until_limit(itens, watermark, obtido_em)
+            data_collection.extend(new_data)
 
-                if "dia(s) atrás" in date:
-                    debug("Data limite encontrada. Encerrando scraping.")
-                    return pd.DataFrame(data)
+            if limite or len(itens) < seletores["max_itens"]:
+                debug(f"Fim da listagem de {segmentacao} na página {page}.")
+                completa = True
+                break
 
             page += 1
 
+    except TimeoutException:
+        debug(f"Tempo limite excedido ao carregar a página de {segmentacao}.")
     except Exception as e:
-        debug(f"Erro durante o scraping: {str(e)}")
-    finally:
-        driver.quit()
-    
-    return pd.DataFrame(data)
+        debug(f"Erro durante o scraping de {segmentacao}: {str(e)}")
+
+    df = pd.DataFrame(data_collection, columns=["Link", "Título", "Publicado_em"])
+    df['Segmentação'] = segmentacao
+    return df, completa, obtida_em
+
+def scrape_agrotimes(pool=None, watermark=None):
+    return crawl_listing("https://www.moneytimes.com.br/agrotimes/", "agrotimes", "Agronegócio", pool, watermark)
+
+def scrape_moneytimes(url_site, segmentacao, pool=None, watermark=None):
+    return crawl_listing(url_site, "moneytimes", segmentacao, pool, watermark)
 
 ### SCRAPING DE CONTEÚDO DOS ARTIGOS ###
-def scrape_articles(df):
-    driver = setup_driver()
-    dados = []
-    total_artigos = len(df)
-    
+def parse_article_html(html, seletores=SELETORES["artigo"]):
+    """Extrai data e texto do HTML de um artigo. Retorna None se não houver parágrafos"""
+    arvore = lxml_html.fromstring(html)
+
+    paragrafos = [p.text_content().strip() for p in arvore.xpath(seletores["paragrafos"])]
+    paragrafos = [p for p in paragrafos if p]
+    if not paragrafos:
+        # Sem parágrafos no HTML bruto: o conteúdo provavelmente depende de JavaScript
+        return None
+
+    datas = arvore.xpath(seletores["data"])
+    data = _texto(datas[0]) if datas else "ausente"
+
+    return {'Data': data, 'Artigo': "\n".join(paragrafos)}
+
+async def _fetch_article(session, semaforo, link, cache, limiter):
+    if not isinstance(link, str) or not link.startswith("http"):
+        debug(f"Link inválido: {link}")
+        return {'Data': None, 'Artigo': None, 'definitivo': True}
+
+    entrada = cache.get(link)
+    if entrada and (MODO_REPLAY or entrada['idade'] < TTL_ARTIGO):
+        return parse_article_html(entrada['html'])
+    if MODO_REPLAY:
+        debug(f"Artigo fora do cache no modo replay: {link}")
+        return {'Data': None, 'Artigo': None, 'definitivo': True}
+
+    # Revalida a cópia em cache com os validadores HTTP, se houver
+    headers = {}
+    if entrada and entrada['etag']:
+        headers["If-None-Match"] = entrada['etag']
+    if entrada and entrada['last_modified']:
+        headers["If-Modified-Since"] = entrada['last_modified']
+
+    async with semaforo:
+        espera = limiter.reservar(link)
+        if espera > 0:
+            await asyncio.sleep(espera)
+
+        inicio_requisicao = time.monotonic()
+        try:
+            # O corpo é lido antes de registrar, para que uma falha no meio da leitura conte como erro do host
+            async with session.get(link, headers=headers) as resposta:
+                status = resposta.status
+                validadores = (resposta.headers.get("ETag"), resposta.headers.get("Last-Modified"))
+                html = await resposta.text(errors="replace") if status == 200 else None
+        except asyncio.TimeoutError:
+            limiter.registrar(link, erro=True)
+            debug(f"Tempo limite excedido em {link}")
+            return None
+        except aiohttp.ClientError as e:
+            # Conexão recusada ou reiniciada, resposta truncada etc.: também faz o host recuar
+            limiter.registrar(link, erro=True)
+            debug(f"Falha HTTP em {link}: {str(e)}")
+            return None
+        except Exception as e:
+            debug(f"Erro ao baixar {link}: {str(e)}")
+            return None
+        limiter.registrar(link, time.monotonic() - inicio_requisicao, status)
+
+    if status == 304 and entrada:
+        cache.touch(link)
+        return parse_article_html(entrada['html'])
+    if status in (404, 410):
+        debug(f"Artigo não encontrado: {link}")
+        return {'Data': None, 'Artigo': None, 'definitivo': True}
+    if status != 200:
+        debug(f"HTTP {status} em {link}")
+        return None
+
+    resultado = parse_article_html(html)
+    # HTML sem o texto (depende de JavaScript) não é guardado: o navegador grava a versão renderizada
+    if resultado is not None:
+        cache.put(link, html, *validadores)
+    return resultado
+
+async def _fetch_articles(links, concorrencia, cache, limiter):
+    semaforo = asyncio.Semaphore(concorrencia)
+    conector = aiohttp.TCPConnector(limit=concorrencia)
+    timeout = aiohttp.ClientTimeout(total=TIMEOUT_HTTP)
+
+    async with aiohttp.ClientSession(connector=conector, timeout=timeout, headers=HEADERS_HTTP) as session:
+        return await asyncio.gather(*(_fetch_article(session, semaforo, link, cache, limiter) for link in links))
+
+def fetch_articles_http(links, concorrencia=CONCORRENCIA_HTTP, cache=None, limiter=None):
+    """Baixa os artigos via HTTP com concorrência limitada. None indica que a página precisa do navegador.
+
+    `cache` e `limiter` permitem usar um cache e um limitador próprios (ex.: em testes);
+    por padrão são o cache em disco e o limitador compartilhados.
+    """
+    cache = cache or get_cache()
+    limiter = limiter or host_limiter
+    return asyncio.run(_fetch_articles(list(links), concorrencia, cache, limiter))
+
+def scrape_article_selenium(link, pool=None):
+    """Carrega um artigo no navegador (para páginas que dependem de JavaScript)"""
     try:
-        for count, (index, row) in enumerate(df.iterrows(), 1):
-            try:
-                driver.get(row['Link'])
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.XPATH, '/html/body/article/div[2]/div/div[1]/div[2]/div[2]/span[1]'))
-                )
-
-                # Data
-                try:
-                    data = driver.find_element(By.XPATH, '/html/body/article/div[2]/div/div[1]/div[2]/div[2]/span[1]').text
-                except:
-                    data = "ausente"
-
-                # Artigo
-                artigo = []
-                i = 1
-                while True:
-                    try:
-                        paragrafo = driver.find_element(
-                            By.XPATH, f'/html/body/article/div[3]/div[1]/div[1]/p[{i}]').text
-                        artigo.append(paragrafo)
-                        i += 1
-                    except:
-                        break
-
-                dados.append({
-                    'Data': data,
-                    'Artigo': "\n".join(artigo)
-                })
-
-                # Cálculo corrigido do progresso
-                percentual = (count / total_artigos) * 100
-                debug(f"Progresso: {percentual:.2f}% concluído")
+        # Ignora no cache uma cópia sem parágrafos, que seria o HTML bruto e não o renderizado
+        html, _ = load_page(link, SELETORES["artigo"]["espera"], TTL_ARTIGO, pool,
+                            valida=lambda html: parse_article_html(html) is not None)
+        # Página renderizada mas sem texto: não adianta tentar de novo
+        return parse_article_html(html) or {'Data': "ausente", 'Artigo': "", 'definitivo': True}
 
+    except Exception as e:
+        debug(f"Erro no artigo {link}: {str(e)}")
+        return {'Data': None, 'Artigo': None}
+
+def scrape_articles(df, pool=None, indice=None):
+    """Completa o df com data e texto dos artigos. Retorna o df e os links cuja coleta falhou
+    por um erro temporário (rede, navegador), que devem ser tentados de novo na próxima execução"""
+    indice = indice or get_index()
+    links = df['Link'].tolist()
+    total_artigos = len(links)
+
+    # Reaproveita os artigos já coletados em execuções anteriores
+    conhecidos = indice.buscar(links)
+    resultados = [conhecidos.get(link) for link in links]
+    novos = [i for i, resultado in enumerate(resultados) if resultado is None]
+    debug(f"{total_artigos - len(novos)} artigos reaproveitados do índice. {len(novos)} novos.")
+
+    # Primeiro tenta os artigos novos sem navegador
+    if novos:
+        debug(f"Baixando {len(novos)} artigos via HTTP...")
+        baixados = fetch_articles_http([links[i] for i in novos])
+        for i, resultado in zip(novos, baixados):
+            resultados[i] = resultado
+
+    pendentes = [i for i in novos if resultados[i] is None]
+    extraidos = sum(1 for i in novos if resultados[i] and resultados[i]['Artigo'])
+    debug(f"{extraidos} artigos extraídos via HTTP.")
+
+    # Apenas as páginas que precisam de JavaScript vão para o Selenium
+    if pendentes:
+        debug(f"{len(pendentes)} artigo(s) precisam do navegador. Usando Selenium...")
+        for count, i in enumerate(pendentes, 1):
+            resultados[i] = scrape_article_selenium(links[i], pool)
+
+            percentual = (count / len(pendentes)) * 100
+            debug(f"Progresso (Selenium): {percentual:.2f}% concluído")
+
+    # No replay o índice não é alterado, para que a próxima execução real não herde o resultado do replay
+    if not MODO_REPLAY:
+        for i in novos:
+            indice.salvar(links[i], resultados[i])
+
+    falhas = [links[i] for i in novos if not resultados[i].get('Artigo') and not resultados[i].get('definitivo')]
+    if falhas:
+        debug(f"{len(falhas)} artigo(s) com falha temporária na coleta.")
+
+    # Mantém o alinhamento com o índice original do DataFrame
+    dados = pd.DataFrame(resultados, index=df.index, columns=['Data', 'Artigo'])
+    return pd.concat([df, dados], axis=1), falhas
+### COLETA PARALELA DAS SEÇÕES ###
+SECOES_MONEYTIMES = [
+    ("https://www.moneytimes.com.br/tag/empresas/", "Empresas"),
+    ("https://www.moneytimes.com.br/tag/resultados/", "Resultados"),
+    ("https://www.moneytimes.com.br/tag/imoveis/", "Imóveis/FIIs"),
+    ("https://www.moneytimes.com.br/tag/bitcoin-btc/", "Bitcoin"),
+    ("https://www.moneytimes.com.br/tag/commodities/", "Commodities")
+]
+
+def nomes_secoes(secoes=SECOES_MONEYTIMES):
+    """Nomes de todas as seções coletadas, na ordem da coleta"""
+    return ["Agronegócio"] + [segmento for _, segmento in secoes]
+
+def crawl_sections(pool=None, secoes=SECOES_MONEYTIMES, workers=WORKERS_SECOES, watermarks=None):
+    """Coleta o Agrotimes e as seções em paralelo (cada uma a partir do seu watermark).
+
+    Devolve os DataFrames na ordem das seções e, para cada seção percorrida até o fim sem erros,
+    o momento em que foi obtida a página mais antiga da sua listagem.
+    """
+    pool = pool or get_pool()
+    watermarks = watermarks or {}
+    tarefas = [("Agronegócio", scrape_agrotimes, ())]
+    tarefas += [(segmento, scrape_moneytimes, (url, segmento)) for url, segmento in secoes]
+
+    dfs = []
+    completas = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futuros = [executor.submit(funcao, *args, pool, watermarks.get(segmento)) for segmento, funcao, args in tarefas]
+
+        # Junta na ordem das tarefas, e não na ordem de término, para o resultado ser determinístico
+        for (segmento, _, _), futuro in zip(tarefas, futuros):
+            try:
+                df_secao, completa, obtida_em = futuro.result()
+                debug(f"Seção {segmento}: {len(df_secao)} itens coletados.")
+                dfs.append(df_secao)
+                if completa:
+                    completas[segmento] = obtida_em
+                else:
+                    debug(f"Seção {segmento} incompleta: o watermark dela não será avançado.")
             except Exception as e:
-                debug(f"Erro no artigo {row['Link']}: {str(e)}")
-                dados.append({'Data': None, 'Artigo': None})
+                debug(f"Erro na seção {segmento}: {str(e)}")
 
-            time.sleep(random.uniform(1, 3))
+    return dfs, completas
 
-    finally:
-        driver.quit()
-
-    return pd.concat([df, pd.DataFrame(dados)], axis=1)
 ### EXECUÇÃO PRINCIPAL ###
 if __name__ == "__main__":
-    # Coleta de dados de todas as seções
-    df_agro = scrape_agrotimes()
-    
-    secoes = [
-        ("https://www.moneytimes.com.br/tag/empresas/", "Empresas"),
-        ("https://www.moneytimes.com.br/tag/resultados/", "Resultados"),
-        ("https://www.moneytimes.com.br/tag/imoveis/", "Imóveis/FIIs"),
-        ("https://www.moneytimes.com.br/tag/bitcoin-btc/", "Bitcoin"),
-        ("https://www.moneytimes.com.br/tag/commodities/", "Commodities")
-    ]
-
-    dfs = [df_agro]
-    for url, segmento in secoes:
-        df_temp = scrape_moneytimes(url, segmento)
-        dfs.append(df_temp)
-        time.sleep(random.uniform(2, 5))
-
-    # Combina todos os DataFrames
-    df_final = pd.concat(dfs, ignore_index=True)
-    
-    # Remove duplicatas
-    df_final = df_final.drop_duplicates(subset=['Link'])
-    
-    # Coleta conteúdo dos artigos
-    df_final = scrape_articles(df_final)
-    
+    # Um único pool de navegadores atende todas as etapas
+    pool = get_pool()
+    try:
+        # Dentro do try: se o aquecimento falhar no meio, os navegadores já abertos são fechados no finally
+        if MODO_REPLAY:
+            debug("Modo replay: usando apenas o cache em disco, sem acessar a rede.")
+        else:
+            pool.aquecer()
+
+        # Só interessam as notícias publicadas depois da última execução concluída de cada seção.
+        # No replay o watermark é ignorado, para o resultado depender apenas do cache
+        watermarks = {}
+        if not MODO_REPLAY:
+            watermarks = {segmento: get_index().get_watermark(segmento) for segmento in nomes_secoes()}
+            for segmento, watermark in watermarks.items():
+                debug(f"Watermark de {segmento}: {watermark or 'nenhum'}")
+
+        # Coleta de dados de todas as seções, em paralelo
+        dfs, completas = crawl_sections(pool, watermarks=watermarks)
+
+        # Combina todos os DataFrames
+        df_final = pd.concat(dfs, ignore_index=True)
+
+        # Remove duplicatas
+        df_final = df_final.drop_duplicates(subset=['Link'])
+
+        # Coleta conteúdo dos artigos (apenas os que não estão no índice)
+        df_final, falhas = scrape_articles(df_final, pool, get_index())
+
+        # A próxima execução só precisa do que for publicado depois da listagem usada nesta (que pode
+        # ter vindo do cache, anterior ao início), mas só nas seções sem nenhuma falha; as demais
+        # repetem a janela e recuperam o que faltou
+        if not MODO_REPLAY:
+            com_falha = set(df_final.loc[df_final['Link'].isin(falhas), 'Segmentação'])
+            for segmento, obtida_em in completas.items():
+                if segmento in com_falha:
+                    debug(f"Seção {segmento} teve artigos com falha: o watermark dela não será avançado.")
+                    continue
+                get_index().set_watermark(obtida_em, segmento)
+    finally:
+        pool.close()
+        get_index().close()
+        # No replay o cache é o corpus gravado: nada expira, senão a captura se apagaria ao ser lida
+        if not MODO_REPLAY:
+            get_cache().evict()
+        get_cache().close()
+        host_limiter.relatorio()
+
     # Salva em CSV
     df_final.to_csv(r'Notícias_scrapped.csv', index=False, encoding='utf-8-sig')
-    
+
     fim = datetime.datetime.now()
     print(f"Demorou: {fim - inicio}")
-    
+
     debug("ARQUIVO SALVO E SCRAPPING CONCLUIDO")
\ No newline at end of file
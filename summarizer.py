@@ -1,29 +1,119 @@
 import pandas as pd
 import numpy as np
-from deep_translator import GoogleTranslator
-from transformers import pipeline, BartTokenizer, BartForConditionalGeneration
 import locale
-from sentence_transformers import SentenceTransformer, util
 import time
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 import requests
 import datetime
+import os
+import re
+import sqlite3
+import hashlib
+import json
+import zlib
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import multiprocessing
+import queue
+from multiprocessing.connection import Listener, Client
+from multiprocessing import AuthenticationError
+import secrets
+import sys
 
-inicio = datetime.datetime.now()
-# Configurar localização para formatação de data
-try:
-    locale.setlocale(locale.LC_TIME, 'pt_BR.utf8')
-except locale.Error:
+# transformers, sentence_transformers, torch e deep_translator são importados só quando usados:
+# importar este módulo (script.py, testes, benchmarks) não carrega nenhuma dessas bibliotecas
+
+def configurar_locale():
+    """Configurar localização para formatação de data"""
     try:
-        locale.setlocale(locale.LC_TIME, 'pt_BR.UTF-8')  # Tentativa alternativa
+        locale.setlocale(locale.LC_TIME, 'pt_BR.utf8')
     except locale.Error:
-        print("Aviso: Não foi possível definir a localização pt_BR. Usando padrão do sistema.")
+        try:
+            locale.setlocale(locale.LC_TIME, 'pt_BR.UTF-8')  # Tentativa alternativa
+        except locale.Error:
+            print("Aviso: Não foi possível definir a localização pt_BR. Usando padrão do sistema.")
 
 # Parâmetros de configuração
 max_tokens = 200
 min_tokens = 50
 similaridade = 0.7
+similaridade_lexical = 0.8  # Jaccard (estimado por MinHash) para considerar dois artigos em português quase idênticos
+tamanho_lote_resumo = 8  # Artigos por chamada ao generate (agrupados por tamanho)
+
+# Backend de tradução: "google" (web, padrão) ou "marian" (modelos opus-mt locais, funcionam offline)
+backend_traducao = os.environ.get("NEURON_TRADUCAO", "google")
+tamanho_lote_traducao = 16  # Frases por forward pass no backend local
+workers_traducao = 4            # Artigos traduzidos ao mesmo tempo (backend web)
+max_requisicoes_traducao = 4    # Teto global de requisições simultâneas ao tradutor
+taxa_max_traducao = 3.0         # Teto global de requisições por segundo ao tradutor
+modelos_marian = {
+    # (origem, destino): (modelo, prefixo de idioma exigido pelo modelo)
+    ('pt', 'en'): ("Helsinki-NLP/opus-mt-ROMANCE-en", ""),
+    ('en', 'pt'): ("Helsinki-NLP/opus-mt-en-ROMANCE", ">>pt_br<< "),
+}
+
+# Modelos
+modelo_resumo = "facebook/bart-large-cnn"
+modelo_embeddings = "all-MiniLM-L6-v2"
+modelo_embeddings_multilingue = "paraphrase-multilingual-MiniLM-L12-v2"  # Entende português, usado antes da tradução
+bloco_similaridade = 2048  # Linhas/colunas por bloco da matriz de similaridade (~16 MB em float32)
+tamanho_lote_embeddings = int(os.environ.get("NEURON_LOTE_EMBEDDINGS", 64))  # Textos por forward pass do encoder
+pasta_cache_embeddings = "cache_embeddings"  # Embeddings já calculados, por modelo e hash do texto
+max_entradas_cache_embeddings = 100000
+
+# Deduplicação semântica dos originais em português antes da tradução (NEURON_DEDUP_PT=1).
+# Cada duplicata removida aqui economiza uma tradução, um resumo e uma tradução de volta
+dedup_portugues = os.environ.get("NEURON_DEDUP_PT") == "1"
+
+# Backend de inferência do BART: "torch" (fp32, padrão), "int8" (quantização dinâmica)
+# ou "onnx" (ONNX Runtime com cache de past-key-values; requer optimum[onnxruntime])
+backend_resumo = os.environ.get("NEURON_BACKEND_RESUMO", "torch")
+pasta_onnx = "bart_onnx"  # Modelo exportado uma vez e reaproveitado nas próximas execuções
+
+# Resumo em vários processos (NEURON_PROCESSOS_RESUMO, 1 = desligado). Cada processo carrega o modelo uma vez
+# (no Linux os pesos são herdados do processo principal via fork) e usa sua parte das threads da máquina
+processos_resumo = int(os.environ.get("NEURON_PROCESSOS_RESUMO", 1))
+
+# Modo orçamento: segundos disponíveis para a etapa de resumos (NEURON_ORCAMENTO_RESUMO; vazio = sem limite)
+orcamento_resumo = float(os.environ["NEURON_ORCAMENTO_RESUMO"]) if os.environ.get("NEURON_ORCAMENTO_RESUMO") else None
+# Configurações do resumo, da melhor para a mais rápida. O modo orçamento desce um nível sempre que a
+# estimativa de tempo restante passa do orçamento. None = modelo principal / valores padrão
+niveis_resumo = [
+    {'nome': "completo", 'modelo': None, 'num_beams': None, 'max_tokens': None},
+    {'nome': "menos beams", 'modelo': None, 'num_beams': 2, 'max_tokens': None},
+    {'nome': "distilbart guloso", 'modelo': "sshleifer/distilbart-cnn-12-6", 'num_beams': 1, 'max_tokens': None},
+    {'nome': "distilbart curto", 'modelo': "sshleifer/distilbart-cnn-6-6", 'num_beams': 1, 'max_tokens': 120},
+]
+
+# Worker residente (python summarizer.py --worker): mantém os modelos carregados entre execuções
+endereco_worker = ("127.0.0.1", int(os.environ.get("NEURON_WORKER_PORTA", 6150)))
+# A conexão troca objetos pickle, então a chave precisa ser secreta: vem de NEURON_WORKER_CHAVE ou de um
+# arquivo legível só pelo dono, criado com uma chave aleatória na primeira vez que o worker sobe
+arquivo_chave_worker = os.path.join(os.path.expanduser("~"), ".neuron_worker_chave")
+
+# Memória de tradução persistente (por parágrafo), compartilhada pelas duas direções
+arquivo_memoria_traducao = "memoria_traducao.sqlite"
+max_entradas_memoria = 200000
+
+# MinHash/LSH: assinaturas de `num_permutacoes` valores divididas em `bandas_lsh` faixas.
+# Com 128/16 (8 valores por faixa), pares a partir de ~0.7 de Jaccard quase sempre viram candidatos
+num_permutacoes = 128
+bandas_lsh = 16
+tamanho_shingle = 5  # Palavras por shingle
+
+# Checkpoints por etapa e por artigo (tradução, resumo, tradução de volta): uma execução interrompida
+# retoma de onde parou. Cada resultado é gravado assim que um bloco de artigos termina
+pasta_checkpoints = "checkpoints"
+artigos_por_checkpoint = 32
+dias_checkpoints = 3  # Resultados mais antigos são descartados ao fim de cada execução
+
+# Histórico de embeddings dos resumos já enviados, para não repetir notícias de edições anteriores
+arquivo_embeddings_enviados = "embeddings_enviados.f32"        # Matriz float32 (uma linha por resumo), só cresce
+arquivo_indice_enviados = "embeddings_enviados.sqlite"         # Link e data de cada linha da matriz
+dias_historico = 7     # Edições anteriores consideradas (e mantidas em disco)
+bloco_historico = 4096  # Linhas do histórico por multiplicação de matrizes
 
 def debug(message):
     print(f"[DEBUG] {message}")
@@ -65,62 +155,405 @@ def create_retry_session(retries=3, backoff_factor=0.3):
     session.mount('https://', adapter)
     return session
 
+### BACKENDS DE TRADUÇÃO ###
+class RateLimiter:
+    """Espaça as requisições para não passar de `taxa` por segundo, somando todas as threads"""
+
+    def __init__(self, taxa):
+        self.intervalo = 1.0 / taxa
+        self._proxima = 0.0
+        self._lock = threading.Lock()
+
+    def aguardar(self):
+        with self._lock:
+            agora = time.monotonic()
+            inicio = max(agora, self._proxima)
+            self._proxima = inicio + self.intervalo
+        if inicio > agora:
+            time.sleep(inicio - agora)
+
+class _SessaoPorThread:
+    """Substituto do módulo `requests` dentro de deep_translator.google.
+
+    O GoogleTranslator chama requests.get direto e não aceita uma sessão, então a única forma de reaproveitar
+    conexões é trocar esse nome no módulo dele (depende de um detalhe interno da biblioteca). Para não afetar
+    outros usos do deep_translator no processo, só as chamadas feitas dentro de `ativa()` usam a sessão
+    com retry da thread; as demais seguem para o `requests` original.
+    """
+
+    def __init__(self, original):
+        self._original = original
+        self._local = threading.local()
+
+    @contextlib.contextmanager
+    def ativa(self):
+        self._local.ativa = True
+        try:
+            yield
+        finally:
+            self._local.ativa = False
+
+    def get(self, *args, **kwargs):
+        if not getattr(self._local, "ativa", False):
+            return self._original.get(*args, **kwargs)
+        if not hasattr(self._local, "sessao"):
+            self._local.sessao = create_retry_session()
+        return self._local.sessao.get(*args, **kwargs)
+
+    def __getattr__(self, nome):
+        return getattr(self._original, nome)
+
+class GoogleBackend:
+    """Tradução pela web com GoogleTranslator, uma chamada por texto"""
+    lote = False
+
+    def __init__(self):
+        from deep_translator import google as deep_translator_google
+
+        # Instalado uma única vez por processo (ver _SessaoPorThread); se a biblioteca mudar e não houver
+        # mais o nome `requests` no módulo, as traduções seguem sem reaproveitar conexões
+        if not isinstance(getattr(deep_translator_google, "requests", None), _SessaoPorThread):
+            if hasattr(deep_translator_google, "requests"):
+                deep_translator_google.requests = _SessaoPorThread(deep_translator_google.requests)
+        sessoes = getattr(deep_translator_google, "requests", None)
+        self._sessoes = sessoes.ativa if isinstance(sessoes, _SessaoPorThread) else contextlib.nullcontext
+        self._tradutores = threading.local()
+        self._simultaneas = threading.BoundedSemaphore(max_requisicoes_traducao)
+        self._taxa = RateLimiter(taxa_max_traducao)
+
+    def _tradutor(self, source, target):
+        tradutores = self._tradutores.__dict__
+        if (source, target) not in tradutores:
+            from deep_translator import GoogleTranslator
+            tradutores[(source, target)] = GoogleTranslator(source=source, target=target)
+        return tradutores[(source, target)]
+
+    def translate_batch(self, texts, source, target, tentativas=3):
+        return [self._translate(text, source, target, tentativas) for text in texts]
+
+    def _translate(self, text, source, target, tentativas):
+        attempts = 0
+        while attempts < tentativas:
+            try:
+                # Respeita o teto global de requisições por segundo para evitar bloqueios
+                self._taxa.aguardar()
+                with self._simultaneas, self._sessoes():
+                    translated = self._tradutor(source, target).translate(text)
+                if translated:
+                    return translated
+                debug("Tradução retornou texto vazio")
+                attempts += 1
+            except Exception as e:
+                debug(f"Erro na tentativa {attempts+1}: {str(e)}")
+                if attempts + 1 < tentativas:
+                    time.sleep(2 ** attempts)  # Backoff exponencial
+                attempts += 1
+
+        debug(f"Falha na tradução após {tentativas} tentativa(s)")
+        return ""
+
+class MarianBackend:
+    """Tradução local com MarianMT (opus-mt): traduz lotes de frases em um único forward pass"""
+    lote = True
+
+    def __init__(self):
+        self._modelos = {}
+
+    def _modelo(self, source, target):
+        if (source, target) not in self._modelos:
+            from transformers import MarianMTModel, MarianTokenizer
+            nome, prefixo = modelos_marian[(source, target)]
+            debug(f"Carregando modelo de tradução {nome}...")
+            self._modelos[(source, target)] = (
+                MarianTokenizer.from_pretrained(nome), MarianMTModel.from_pretrained(nome).eval(), prefixo
+            )
+        return self._modelos[(source, target)]
+
+    def _segmentos(self, text):
+        """Divide em parágrafos e frases, pois o modelo aceita no máximo 512 tokens por entrada"""
+        paragrafos = [p.strip() for p in text.split("\n") if p.strip()]
+        return [re.split(r'(?<=[.!?])\s+', p) for p in paragrafos]
+
+    def translate_batch(self, texts, source, target):
+        import torch
+        tok, modelo, prefixo = self._modelo(source, target)
+
+        # Junta as frases de todos os textos e traduz em lotes de tamanho parecido
+        estrutura = [self._segmentos(text) if isinstance(text, str) else [] for text in texts]
+        frases = [frase for paragrafos in estrutura for paragrafo in paragrafos for frase in paragrafo]
+        ordem = sorted(range(len(frases)), key=lambda k: len(frases[k]))
+        traduzidas = [""] * len(frases)
+
+        for inicio_lote in range(0, len(ordem), tamanho_lote_traducao):
+            lote = ordem[inicio_lote:inicio_lote + tamanho_lote_traducao]
+            inputs = tok([prefixo + frases[k] for k in lote], max_length=512, truncation=True,
+                         padding=True, return_tensors="pt")
+            with torch.inference_mode():
+                ids = modelo.generate(**inputs, max_length=512)
+            for k, traducao in zip(lote, tok.batch_decode(ids, skip_special_tokens=True)):
+                traduzidas[k] = traducao
+
+        # Remonta cada texto mantendo a quebra de parágrafos
+        resultado = []
+        posicao = 0
+        for paragrafos in estrutura:
+            partes = []
+            for paragrafo in paragrafos:
+                partes.append(" ".join(traduzidas[posicao:posicao + len(paragrafo)]))
+                posicao += len(paragrafo)
+            resultado.append("\n".join(partes))
+        return resultado
+
+_backend = None
+
+def get_translation_backend():
+    """Retorna o backend de tradução configurado, criando-o na primeira chamada"""
+    global _backend
+    if _backend is None:
+        backends = {"google": GoogleBackend, "marian": MarianBackend}
+        _backend = backends[backend_traducao]()
+        debug(f"Backend de tradução: {backend_traducao}")
+    return _backend
+
+### MEMÓRIA DE TRADUÇÃO ###
+class TranslationMemory:
+    """Cache SQLite de traduções, chaveado pelo hash de (origem, destino, texto normalizado)"""
+
+    def __init__(self, caminho=None):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(caminho or arquivo_memoria_traducao, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS traducoes (
+                chave TEXT PRIMARY KEY,
+                traducao TEXT,
+                acessado_em REAL
+            )
+        """)
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _chave(text, source, target):
+        normalizado = " ".join(text.split())
+        return hashlib.sha256(f"{source}\x1f{target}\x1f{normalizado}".encode("utf-8")).hexdigest()
+
+    def get_many(self, texts, source, target):
+        """Retorna a tradução de cada texto, ou None quando não está na memória"""
+        resultado = []
+        agora = time.time()
+        with self._lock:
+            for text in texts:
+                chave = self._chave(text, source, target)
+                linha = self._conn.execute("SELECT traducao FROM traducoes WHERE chave = ?", (chave,)).fetchone()
+                if linha:
+                    self._conn.execute("UPDATE traducoes SET acessado_em = ? WHERE chave = ?", (agora, chave))
+                    self.hits += 1
+                    resultado.append(linha[0])
+                else:
+                    self.misses += 1
+                    resultado.append(None)
+            self._conn.commit()
+        return resultado
+
+    def put_many(self, pares, source, target):
+        """Guarda pares (texto, tradução); traduções vazias são ignoradas"""
+        agora = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO traducoes (chave, traducao, acessado_em) VALUES (?, ?, ?)",
+                [(self._chave(text, source, target), traducao, agora) for text, traducao in pares if traducao]
+            )
+            self._conn.commit()
+
+    def evict(self, max_entradas=None):
+        """Remove as entradas menos usadas além do limite"""
+        max_entradas = max_entradas or max_entradas_memoria
+        with self._lock:
+            removidas = self._conn.execute("""
+                DELETE FROM traducoes WHERE chave IN (
+                    SELECT chave FROM traducoes ORDER BY acessado_em DESC LIMIT -1 OFFSET ?
+                )
+            """, (max_entradas,)).rowcount
+            self._conn.commit()
+        if removidas:
+            debug(f"Memória de tradução: {removidas} entradas antigas removidas")
+
+    def relatorio(self):
+        total = self.hits + self.misses
+        taxa = (self.hits / total) * 100 if total else 0
+        debug(f"Memória de tradução: {self.hits} acertos, {self.misses} faltas ({round(taxa, 2)}% de acerto)")
+
+_memoria = None
+
+def get_translation_memory():
+    """Retorna a memória de tradução compartilhada, abrindo-a na primeira chamada"""
+    global _memoria
+    if _memoria is None:
+        _memoria = TranslationMemory()
+    return _memoria
+
+def split_paragraphs(text):
+    return [p.strip() for p in text.split("\n") if p.strip()]
+
+def translate_cached(texts, source, target):
+    """Traduz uma lista de textos consultando antes a memória de tradução"""
+    memoria = get_translation_memory()
+    validos = [i for i, text in enumerate(texts) if isinstance(text, str) and text.strip()]
+    resultado = [""] * len(texts)
+    for i, traducao in zip(validos, memoria.get_many([texts[i] for i in validos], source, target)):
+        resultado[i] = traducao
+    faltando = [i for i, traducao in enumerate(resultado) if traducao is None]
+
+    if faltando:
+        traduzidos = get_translation_backend().translate_batch([texts[i] for i in faltando], source, target)
+        for i, traducao in zip(faltando, traduzidos):
+            resultado[i] = traducao
+        memoria.put_many([(texts[i], resultado[i]) for i in faltando], source, target)
+
+    return resultado
+
+def translate_concurrently(funcao, textos, rotulo, workers=None):
+    """Aplica `funcao` a vários textos em paralelo e devolve os resultados na ordem de entrada"""
+    workers = workers or workers_traducao
+    resultados = [""] * len(textos)
+    total = len(textos)
+    concluidos = 0
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futuros = {executor.submit(funcao, text): i for i, text in enumerate(textos)}
+        for futuro in as_completed(futuros):
+            i = futuros[futuro]
+            try:
+                resultados[i] = futuro.result()
+            except Exception as e:
+                debug(f"Erro ao traduzir texto {i}: {e}")
+            concluidos += 1
+            progress = (concluidos / total) * 100
+            debug(f"Progresso {rotulo}: {round(progress, 2)}% ({concluidos}/{total})")
+
+    return resultados
+
+### DIVISÃO E EMPACOTAMENTO DOS TEXTOS PARA TRADUÇÃO ###
+# Pontuação final seguida de espaço e início de nova frase, sem quebrar em abreviações comuns
+padrao_fim_frase = re.compile(r'(?<=[.!?…])(?<!Sr\.)(?<!Sra\.)(?<!Dr\.)(?<!Dra\.)(?<!Prof\.)(?<!Av\.)(?<!etc\.)\s+(?=["“(\dA-ZÀ-Ý])')
+
+def split_sentences(text):
+    """Divide um parágrafo em frases"""
+    return [f.strip() for f in padrao_fim_frase.split(text) if f.strip()]
+
+def split_long_paragraph(paragrafo, limite):
+    """Quebra um parágrafo maior que o limite em grupos de frases inteiras"""
+    if len(paragrafo) <= limite:
+        return [paragrafo]
+
+    partes = []
+    for frase in split_sentences(paragrafo):
+        if len(frase) > limite:
+            # Frase sozinha maior que o limite: só resta cortar em janelas fixas
+            partes.extend(frase[k:k + limite] for k in range(0, len(frase), limite))
+        elif partes and len(partes[-1]) + 1 + len(frase) <= limite:
+            partes[-1] += " " + frase
+        else:
+            partes.append(frase)
+    return partes
+
+def join_with_markers(segmentos):
+    """Junta segmentos em um só texto, cada um precedido por um marcador numerado [#k]"""
+    return "\n".join(f"[#{k}]\n{segmento}" for k, segmento in enumerate(segmentos))
+
+def split_markers(traduzido, quantidade):
+    """Separa de volta os segmentos pelos marcadores. Retorna None se algum marcador se perdeu"""
+    partes = re.split(r'\[\s*#\s*(\d+)\s*\]', traduzido or "")
+    numeros, textos = partes[1::2], partes[2::2]
+    if partes[0].strip() or numeros != [str(k) for k in range(quantidade)]:
+        return None
+    return [" ".join(text.split()) for text in textos]
+
+def pack_segments(segmentos, limite):
+    """Agrupa segmentos consecutivos em blocos de até `limite` caracteres (contando os marcadores)"""
+    blocos = []
+    tamanho = 0
+    for i, segmento in enumerate(segmentos):
+        custo = len(segmento) + len(f"[#{i}]\n\n")
+        if blocos and tamanho + custo <= limite:
+            blocos[-1].append(i)
+            tamanho += custo
+        else:
+            blocos.append([i])
+            tamanho = custo
+    return blocos
+
+def translate_segments(segmentos, source, target, chunk_size=4000):
+    """Traduz segmentos curtos usando a memória e empacotando vários por requisição"""
+    backend = get_translation_backend()
+    if backend.lote:
+        # Backend local já traduz em lotes de frases
+        return translate_cached(segmentos, source, target)
+
+    memoria = get_translation_memory()
+    resultado = memoria.get_many(segmentos, source, target)
+    faltando = [i for i, traducao in enumerate(resultado) if traducao is None]
+    if not faltando:
+        return resultado
+
+    blocos = pack_segments([segmentos[i] for i in faltando], chunk_size)
+    debug(f"{len(faltando)} segmentos a traduzir em {len(blocos)} requisições")
+
+    def traduzir_bloco(bloco):
+        partes = [segmentos[faltando[k]] for k in bloco]
+        if len(partes) == 1:
+            return backend.translate_batch(partes, source, target)
+        separados = split_markers(backend.translate_batch([join_with_markers(partes)], source, target)[0], len(partes))
+        if separados is None:
+            debug("Marcadores perdidos na tradução. Traduzindo os segmentos do bloco separadamente...")
+            return backend.translate_batch(partes, source, target)
+        return separados
+
+    for bloco, traducoes in zip(blocos, translate_concurrently(traduzir_bloco, blocos, "da tradução")):
+        traducoes = traducoes or [""] * len(bloco)
+        for k, traducao in zip(bloco, traducoes):
+            resultado[faltando[k]] = traducao
+
+    memoria.put_many([(segmentos[i], resultado[i]) for i in faltando], source, target)
+    return resultado
+
+def translate_articles(textos, source, target, chunk_size=4000):
+    """Traduz vários textos de uma vez, respeitando parágrafos e frases, e devolve na ordem de entrada"""
+    segmentos = []
+    donos = []  # (texto, parágrafo) de cada segmento
+    for t, text in enumerate(textos):
+        if not isinstance(text, str) or not text.strip():
+            continue
+        for p, paragrafo in enumerate(split_paragraphs(text)):
+            for segmento in split_long_paragraph(paragrafo, chunk_size):
+                segmentos.append(segmento)
+                donos.append((t, p))
+
+    paragrafos = [{} for _ in textos]
+    for (t, p), traducao in zip(donos, translate_segments(segmentos, source, target, chunk_size)):
+        paragrafos[t].setdefault(p, []).append(traducao or "")
+
+    resultado = []
+    for partes in paragrafos:
+        linhas = [" ".join(x for x in pedacos if x) for pedacos in partes.values()]
+        resultado.append("\n".join(linha for linha in linhas if linha))
+    return resultado
+
 def translate_text(text, chunk_size=4000):
     """Traduz texto de português para inglês, com tratamento de erros"""
     # Se o texto for nulo ou não for uma string, retornar texto vazio
     if not isinstance(text, str) or pd.isna(text):
         debug("Texto nulo ou não é string. Pulando...")
         return ""
-    
+
     debug(f"Traduzindo texto de {len(text)} caracteres")
-    translated_chunks = []
-    
-    # Dividir o texto em chunks para evitar limites de API
-    for i in range(0, len(text), chunk_size):
-        chunk = text[i:i + chunk_size]
-        if not chunk.strip():  # Ignorar chunks vazios
-            continue
-            
-        success = False
-        attempts = 0
-        
-        while not success and attempts < 3:
-            try:
-                # Adicionar um tempo aleatório entre solicitações para evitar bloqueios
-                time.sleep(np.random.uniform(0.5, 2.0))
-                translated = GoogleTranslator(source='pt', target='en').translate(chunk)
-                if translated:
-                    translated_chunks.append(translated)
-                    success = True
-                else:
-                    debug("Tradução retornou texto vazio")
-                    attempts += 1
-            except Exception as e:
-                debug(f"Erro na tentativa {attempts+1}: {str(e)}")
-                time.sleep(2 ** attempts)  # Backoff exponencial
-                attempts += 1
-                
-        if not success:
-            debug("Falha na tradução após 3 tentativas - retornando texto parcial")
-            
-    return ' '.join(translated_chunks)
+    return translate_articles([text], 'pt', 'en', chunk_size)[0]
 
 def process_translations(df):
-    """Processa todas as traduções com controle de progresso"""
-    translated_texts = []
-    total = len(df)
-    
-    for i, article in enumerate(df['Artigo']):
-        try:
-            translated = translate_text(article)
-            translated_texts.append(translated)
-            progress = ((i + 1) / total) * 100
-            debug(f"Progresso da tradução: {round(progress, 2)}% ({i+1}/{total})")
-        except Exception as e:
-            debug(f"Erro ao traduzir artigo {i}: {e}")
-            translated_texts.append("")  # Adicionar string vazia para manter o alinhamento
-    
-    return translated_texts
+    """Processa todas as traduções, empacotando parágrafos de vários artigos por requisição"""
+    debug(f"Traduzindo {len(df)} artigos...")
+    return translate_articles(list(df['Artigo']), 'pt', 'en')
 
 def summarize_text(text, min_tokens, max_tokens):
     """Resumir texto usando o modelo BART"""
@@ -146,131 +579,1016 @@ def summarize_text(text, min_tokens, max_tokens):
         debug(f"Erro ao resumir texto: {e}")
         return ""
 
-def process_summaries(df):
-    """Processa todos os resumos com controle de progresso"""
-    summaries = []
-    total = len(df)
-    
-    for i, text in enumerate(df['artigo_ingles']):
+def summarize_batch(texts, min_tokens, max_tokens, num_beams=None, modelo=None):
+    """Resumir um lote de textos em uma única chamada ao modelo BART"""
+    import torch
+    tok, modelo_bart = modelo or (tokenizer, model_large)
+    opcoes = {'num_beams': num_beams} if num_beams else {}
+
+    inputs = tok(texts, max_length=1024, truncation=True, padding=True, return_tensors="pt")
+    with torch.inference_mode():
+        summary_ids = modelo_bart.generate(
+            inputs["input_ids"],
+            attention_mask=inputs["attention_mask"],
+            max_length=max_tokens,
+            min_length=min_tokens,
+            no_repeat_ngram_size=3,
+            early_stopping=True,
+            **opcoes
+        )
+    return tok.batch_decode(summary_ids, skip_special_tokens=True)
+
+def process_summaries(df, batch_size=None, orcamento=None, prazo=None, ao_concluir=None):
+    """Processa todos os resumos em lotes de artigos com tamanhos parecidos.
+
+    Com `orcamento` (segundos) ou `prazo` (time.time() limite), mede a velocidade a cada lote e passa para
+    configurações mais rápidas de `niveis_resumo` quando o tempo estimado para o restante não cabe no que sobrou.
+    `ao_concluir(posicoes, resumos)` é chamada após cada lote (ex.: para gravar checkpoints).
+    """
+    batch_size = batch_size or tamanho_lote_resumo
+    orcamento = orcamento if orcamento is not None else orcamento_resumo
+    inicio_resumos = time.time()
+    if prazo is None and orcamento:
+        prazo = inicio_resumos + orcamento
+    texts = list(df['artigo_ingles'])
+    summaries = [""] * len(texts)
+
+    # Mesmo limite de caracteres usado em summarize_text
+    validos = [(i, text[:10000]) for i, text in enumerate(texts) if isinstance(text, str) and text.strip()]
+    if len(validos) < len(texts):
+        debug(f"{len(texts) - len(validos)} textos vazios para resumo - pulando")
+    if not validos:
+        return summaries
+
+    # Ordena por número de tokens para que cada lote tenha pouco preenchimento (padding)
+    tamanhos = [len(ids) for ids in tokenizer([text for _, text in validos], max_length=1024, truncation=True)["input_ids"]]
+    ordem = sorted(range(len(validos)), key=lambda k: tamanhos[k])
+
+    total = len(validos)
+    concluidos = 0
+
+    # Controle do orçamento: velocidade medida em segundos por token de entrada no nível atual
+    nivel = 0
+    por_nivel = [0] * len(niveis_resumo)
+    tokens_restantes = sum(tamanhos)
+    inicio_nivel = time.time()
+    tokens_nivel = 0
+
+    for inicio_lote in range(0, total, batch_size):
+        lote = ordem[inicio_lote:inicio_lote + batch_size]
+        lote_textos = [validos[k][1] for k in lote]
+        config = niveis_resumo[nivel]
+        limite_tokens = config['max_tokens'] or max_tokens
         try:
-            summary = summarize_text(text, min_tokens, max_tokens)
-            summaries.append(summary)
-            progress = ((i + 1) / total) * 100
-            debug(f"Progresso dos resumos: {round(progress, 2)}% ({i+1}/{total})")
+            modelo = get_summarization_model(config['modelo']) if config['modelo'] else None
+            resumos = summarize_batch(lote_textos, min_tokens, limite_tokens, config['num_beams'], modelo)
         except Exception as e:
-            debug(f"Erro ao resumir texto {i}: {e}")
-            summaries.append("")
-    
+            debug(f"Erro ao resumir lote: {e}. Resumindo um a um...")
+            resumos = [summarize_text(text, min_tokens, max_tokens) for text in lote_textos]
+
+        # Devolve cada resumo para a posição original do artigo
+        for k, resumo in zip(lote, resumos):
+            summaries[validos[k][0]] = resumo
+        if ao_concluir is not None:
+            ao_concluir([validos[k][0] for k in lote], resumos)
+
+        concluidos += len(lote)
+        progress = (concluidos / total) * 100
+        debug(f"Progresso dos resumos: {round(progress, 2)}% ({concluidos}/{total})")
+
+        por_nivel[nivel] += len(lote)
+        tokens_lote = sum(tamanhos[k] for k in lote)
+        tokens_restantes -= tokens_lote
+        tokens_nivel += tokens_lote
+
+        if prazo and tokens_restantes > 0 and nivel < len(niveis_resumo) - 1:
+            agora = time.time()
+            estimativa = (agora - inicio_nivel) / tokens_nivel * tokens_restantes
+            disponivel = prazo - agora
+            if estimativa > disponivel:
+                nivel += 1
+                debug(f"Estimativa de {round(estimativa)}s para o restante, mas restam {round(disponivel)}s "
+                      f"do orçamento. Passando para o nível '{niveis_resumo[nivel]['nome']}'.")
+                # Carrega o modelo do novo nível antes de zerar a medição, para que o tempo de carga
+                # não entre na velocidade do nível (se falhar, o próximo lote cai no resumo um a um)
+                if niveis_resumo[nivel]['modelo']:
+                    try:
+                        get_summarization_model(niveis_resumo[nivel]['modelo'])
+                    except Exception as e:
+                        debug(f"Erro ao carregar o modelo do nível '{niveis_resumo[nivel]['nome']}': {e}")
+                inicio_nivel = time.time()
+                tokens_nivel = 0
+
+    if prazo:
+        rapidos = total - por_nivel[0]
+        detalhes = ", ".join(f"{c['nome']}: {n}" for c, n in zip(niveis_resumo, por_nivel) if n)
+        debug(f"Modo orçamento ({round(prazo - inicio_resumos, 1)}s restantes no início): {rapidos} de {total} artigos "
+              f"no caminho rápido ({detalhes}). Tempo total: {round(time.time() - inicio_resumos)}s")
+
     return summaries
 
-def compute_cosine_similarity(df, column_name):
-    """Calcula a similaridade do cosseno entre os textos"""
-    debug("Calculando similaridade entre os textos...")
-    
-    # Verificar se há textos vazios
-    empty_texts = df[column_name].apply(lambda x: not isinstance(x, str) or not x.strip()).sum()
-    if empty_texts > 0:
-        debug(f"Aviso: {empty_texts} textos vazios encontrados na coluna {column_name}")
-    
-    # Filtra para usar apenas textos não vazios
-    valid_texts = df[df[column_name].apply(lambda x: isinstance(x, str) and bool(x.strip()))]
-    
-    if len(valid_texts) == 0:
-        debug("Nenhum texto válido para calcular similaridade")
-        return pd.DataFrame()
-    
+def _processo_resumo(tarefas, resultados, threads):
+    """Laço de cada processo do resumo paralelo: pega lotes da fila até receber None"""
+    import torch
+    torch.set_num_threads(threads)
+    load_summarization_model()
+    while True:
+        tarefa = tarefas.get()
+        if tarefa is None:
+            break
+        posicoes, textos = tarefa
+        try:
+            resumos = summarize_batch(textos, min_tokens, max_tokens)
+        except Exception as e:
+            debug(f"Erro ao resumir lote: {e}. Resumindo um a um...")
+            resumos = [summarize_text(text, min_tokens, max_tokens) for text in textos]
+        resultados.put((posicoes, resumos))
+
+def process_summaries_parallel(textos, processos=None, batch_size=None, ao_concluir=None):
+    """Resume os textos em `processos` processos que consomem lotes de uma fila compartilhada; a ordem é preservada.
+    `ao_concluir(posicoes, resumos)` recebe cada lote assim que volta de um processo"""
+    processos = processos or processos_resumo
+    batch_size = batch_size or tamanho_lote_resumo
+    textos = list(textos)
+    summaries = [""] * len(textos)
+
+    validos = [(i, text[:10000]) for i, text in enumerate(textos) if isinstance(text, str) and text.strip()]
+    if not validos:
+        return summaries
+
+    # Lotes de textos com tamanhos parecidos, os mais longos primeiro para equilibrar a carga no final
+    validos.sort(key=lambda item: len(item[1]), reverse=True)
+    # Poucos textos: lotes menores para que todos os processos recebam trabalho
+    batch_size = max(1, min(batch_size, -(-len(validos) // processos)))
+    lotes = [validos[k:k + batch_size] for k in range(0, len(validos), batch_size)]
+    processos = min(processos, len(lotes))
+    threads = max(1, (os.cpu_count() or 1) // processos)
+
+    # Com fork, os processos herdam o modelo já carregado (páginas compartilhadas até serem escritas)
+    fork = "fork" in multiprocessing.get_all_start_methods()
+    contexto = multiprocessing.get_context("fork" if fork else "spawn")
+    if fork:
+        load_summarization_model()
+
+    debug(f"Resumindo {len(validos)} textos em {processos} processos com {threads} threads cada...")
+    tarefas = contexto.Queue()
+    resultados = contexto.Queue()
+    for lote in lotes:
+        tarefas.put(([i for i, _ in lote], [text for _, text in lote]))
+    for _ in range(processos):
+        tarefas.put(None)
+
+    trabalhadores = [contexto.Process(target=_processo_resumo, args=(tarefas, resultados, threads), daemon=True)
+                     for _ in range(processos)]
+    for processo in trabalhadores:
+        processo.start()
+
+    # Junta os resultados nas posições originais sem travar se algum processo morrer
+    concluidos = 0
+    recebidos = 0
+    while recebidos < len(lotes) and (any(p.is_alive() for p in trabalhadores) or not resultados.empty()):
+        try:
+            posicoes, resumos = resultados.get(timeout=5)
+        except queue.Empty:
+            continue
+        for i, resumo in zip(posicoes, resumos):
+            summaries[i] = resumo
+        if ao_concluir is not None:
+            ao_concluir(posicoes, resumos)
+        recebidos += 1
+        concluidos += len(posicoes)
+        debug(f"Progresso dos resumos: {round(concluidos / len(validos) * 100, 2)}% ({concluidos}/{len(validos)})")
+
+    for processo in trabalhadores:
+        processo.join(timeout=5)
+    if recebidos < len(lotes):
+        debug(f"Aviso: {len(lotes) - recebidos} lotes sem resumo (processo encerrado com erro)")
+    return summaries
+
+### MODELOS ###
+tokenizer = None
+model_large = None
+_modelos_embeddings = {}
+
+def load_summarization_model():
+    """Carrega tokenizer e BART uma única vez por processo, no backend configurado"""
+    global tokenizer, model_large
+    if model_large is not None:
+        return
+
+    from transformers import BartTokenizer, BartForConditionalGeneration
+
+    debug(f"Carregando modelo de resumo (backend {backend_resumo})...")
+    tokenizer = BartTokenizer.from_pretrained(modelo_resumo)
+
+    if backend_resumo == "onnx":
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        if os.path.isdir(pasta_onnx):
+            model_large = ORTModelForSeq2SeqLM.from_pretrained(pasta_onnx, use_cache=True)
+        else:
+            debug("Exportando BART para ONNX (apenas na primeira execução)...")
+            model_large = ORTModelForSeq2SeqLM.from_pretrained(modelo_resumo, export=True, use_cache=True)
+            model_large.save_pretrained(pasta_onnx)
+        return
+
+    model_large = BartForConditionalGeneration.from_pretrained(modelo_resumo)
+    model_large.eval()
+    if backend_resumo == "int8":
+        import torch
+        # Pesos das camadas lineares em int8; ativações quantizadas em tempo de execução
+        model_large = torch.quantization.quantize_dynamic(model_large, {torch.nn.Linear}, dtype=torch.qint8)
+    elif backend_resumo != "torch":
+        raise ValueError(f"Backend de resumo desconhecido: {backend_resumo}")
+
+_modelos_resumo = {}
+
+def get_summarization_model(nome):
+    """Retorna (tokenizer, modelo) de um modelo de resumo alternativo, carregando-o uma única vez"""
+    if nome not in _modelos_resumo:
+        from transformers import BartTokenizer, BartForConditionalGeneration
+        debug(f"Carregando modelo de resumo {nome}...")
+        modelo = BartForConditionalGeneration.from_pretrained(nome)
+        modelo.eval()
+        _modelos_resumo[nome] = (BartTokenizer.from_pretrained(nome), modelo)
+    return _modelos_resumo[nome]
+
+def get_embedding_model(nome=None):
+    """Retorna um modelo de embeddings (o padrão, se nome=None), carregando-o na primeira chamada"""
+    nome = nome or modelo_embeddings
+    if nome not in _modelos_embeddings:
+        from sentence_transformers import SentenceTransformer
+        debug(f"Carregando modelo de embeddings {nome}...")
+        _modelos_embeddings[nome] = SentenceTransformer(nome)
+    return _modelos_embeddings[nome]
+
+class EmbeddingCache:
+    """Embeddings de um modelo em disco: matriz float32 (memmap) + índice SQLite do hash do texto para a linha"""
+
+    def __init__(self, modelo, pasta=None):
+        pasta = pasta or pasta_cache_embeddings
+        os.makedirs(pasta, exist_ok=True)
+        nome = re.sub(r"[^\w.-]", "_", modelo)
+        self.modelo = modelo
+        self.arquivo_vetores = os.path.join(pasta, f"{nome}.f32")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(pasta, f"{nome}.sqlite"), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS vetores (
+                chave TEXT PRIMARY KEY,
+                posicao INTEGER,
+                acessado_em REAL
+            )
+        """)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (chave TEXT PRIMARY KEY, valor TEXT)")
+        self._conn.commit()
+
+        linha = self._conn.execute("SELECT valor FROM meta WHERE chave = 'dimensao'").fetchone()
+        self.dimensao = int(linha[0]) if linha else None
+        self.total = 0
+        if self.dimensao and os.path.exists(self.arquivo_vetores):
+            self.total = os.path.getsize(self.arquivo_vetores) // (4 * self.dimensao)
+        # Linhas do índice sem vetor gravado (execução interrompida) são descartadas
+        self._conn.execute("DELETE FROM vetores WHERE posicao >= ?", (self.total,))
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _chave(text):
+        return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+    def get_many(self, texts):
+        """Retorna (posições encontradas no cache, matriz com os vetores delas)"""
+        encontrados = {}
+        agora = time.time()
+        with self._lock:
+            for k, text in enumerate(texts):
+                linha = self._conn.execute("SELECT posicao FROM vetores WHERE chave = ?", (self._chave(text),)).fetchone()
+                if linha:
+                    encontrados[k] = linha[0]
+            self._conn.executemany("UPDATE vetores SET acessado_em = ? WHERE posicao = ?",
+                                   [(agora, p) for p in encontrados.values()])
+            self._conn.commit()
+        self.hits += len(encontrados)
+        self.misses += len(texts) - len(encontrados)
+        if not encontrados:
+            return [], None
+
+        matriz = np.memmap(self.arquivo_vetores, dtype=np.float32, mode="r", shape=(self.total, self.dimensao))
+        return list(encontrados), np.asarray(matriz[list(encontrados.values())])
+
+    def put_many(self, texts, embeddings):
+        """Acrescenta os vetores ao fim da matriz"""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        agora = time.time()
+        with self._lock:
+            if self.dimensao is None:
+                self.dimensao = embeddings.shape[1]
+                self._conn.execute("INSERT OR REPLACE INTO meta (chave, valor) VALUES ('dimensao', ?)", (str(self.dimensao),))
+            with open(self.arquivo_vetores, "ab") as f:
+                f.write(embeddings.tobytes())
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO vetores (chave, posicao, acessado_em) VALUES (?, ?, ?)",
+                [(self._chave(text), self.total + k, agora) for k, text in enumerate(texts)]
+            )
+            self._conn.commit()
+            self.total += len(texts)
+
+    def evict(self, max_entradas=None):
+        """Mantém só os vetores mais usados, reescrevendo a matriz"""
+        max_entradas = max_entradas or max_entradas_cache_embeddings
+        with self._lock:
+            manter = self._conn.execute(
+                "SELECT chave, posicao, acessado_em FROM vetores ORDER BY acessado_em DESC LIMIT ?", (max_entradas,)
+            ).fetchall()
+            if len(manter) == self.total:
+                return
+            removidas = self.total - len(manter)
+            manter.sort(key=lambda linha: linha[1])
+
+            matriz = np.memmap(self.arquivo_vetores, dtype=np.float32, mode="r", shape=(self.total, self.dimensao))
+            temporario = self.arquivo_vetores + ".tmp"
+            with open(temporario, "wb") as f:
+                f.write(np.asarray(matriz[[p for _, p, _ in manter]], dtype=np.float32).tobytes())
+            del matriz
+            os.replace(temporario, self.arquivo_vetores)
+
+            self._conn.execute("DELETE FROM vetores")
+            self._conn.executemany("INSERT INTO vetores (chave, posicao, acessado_em) VALUES (?, ?, ?)",
+                                   [(chave, n, acessado) for n, (chave, _, acessado) in enumerate(manter)])
+            self._conn.commit()
+            self.total = len(manter)
+        debug(f"Cache de embeddings ({self.modelo}): {removidas} vetores antigos removidos")
+
+    def relatorio(self):
+        total = self.hits + self.misses
+        taxa = (self.hits / total) * 100 if total else 0
+        debug(f"Cache de embeddings ({self.modelo}): {self.hits} acertos, {self.misses} faltas ({round(taxa, 2)}% de acerto)")
+
+    def close(self):
+        self._conn.close()
+
+_caches_embeddings = {}
+
+def get_embedding_cache(modelo=None):
+    """Retorna o cache de embeddings do modelo, abrindo-o na primeira chamada"""
+    modelo = modelo or modelo_embeddings
+    if modelo not in _caches_embeddings:
+        _caches_embeddings[modelo] = EmbeddingCache(modelo)
+    return _caches_embeddings[modelo]
+
+def encode_texts(textos, modelo=None):
+    """Gera os embeddings dos textos, calculando (no worker residente, se houver) só os que não estão no cache"""
+    textos = list(textos)
+    if not textos:
+        return np.zeros((0, 0), dtype=np.float32)
+    cache = get_embedding_cache(modelo)
+    encontrados, vetores = cache.get_many(textos)
+    faltando = sorted(set(range(len(textos))) - set(encontrados))
+
+    novos = None
+    if faltando:
+        pendentes = [textos[k] for k in faltando]
+        if _worker is not None:
+            novos = np.asarray(_worker.embed(pendentes, modelo), dtype=np.float32)
+        else:
+            novos = get_embedding_model(modelo).encode(pendentes, batch_size=tamanho_lote_embeddings, convert_to_numpy=True)
+        cache.put_many(pendentes, novos)
+
+    dimensao = vetores.shape[1] if vetores is not None else novos.shape[1]
+    embeddings = np.empty((len(textos), dimensao), dtype=np.float32)
+    if encontrados:
+        embeddings[encontrados] = vetores
+    if faltando:
+        embeddings[faltando] = novos
+    return embeddings
+
+### WORKER RESIDENTE ###
+def worker_key(criar=False):
+    """Chave de autenticação do worker: NEURON_WORKER_CHAVE ou o arquivo de chave (criado se `criar`).
+
+    Retorna None se não houver chave, ou se o arquivo puder ser lido por outros usuários.
+    """
+    if os.environ.get("NEURON_WORKER_CHAVE"):
+        return os.environ["NEURON_WORKER_CHAVE"].encode()
+
+    if criar and not os.path.exists(arquivo_chave_worker):
+        # O_EXCL com modo 0600: o arquivo nasce legível só pelo dono, sem janela entre criar e restringir
+        descritor = os.open(arquivo_chave_worker, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(descritor, "w") as arquivo:
+            arquivo.write(secrets.token_hex(32))
+        debug(f"Chave do worker criada em {arquivo_chave_worker}")
+
     try:
-        # Carrega o modelo para embeddings
-        model = SentenceTransformer('all-MiniLM-L6-v2')
-        
-        # Gera embeddings para cada linha da coluna
-        embeddings = model.encode(valid_texts[column_name].tolist(), convert_to_tensor=True)
-        
-        # Calcula a matriz de similaridade de cosseno entre todos os embeddings
-        cosine_similarities = util.cos_sim(embeddings, embeddings)
-        
-        # Retorna a matriz de similaridade como um DataFrame
-        similarity_df = pd.DataFrame(cosine_similarities.cpu().numpy(),
-                                     index=valid_texts.index, columns=valid_texts.index)
-        
-        return similarity_df
-    except Exception as e:
-        debug(f"Erro ao calcular similaridade: {e}")
-        return pd.DataFrame()
+        if os.name == "posix" and os.stat(arquivo_chave_worker).st_mode & 0o077:
+            debug(f"Chave do worker ignorada: {arquivo_chave_worker} pode ser lido por outros usuários (use chmod 600)")
+            return None
+        with open(arquivo_chave_worker, encoding="utf-8") as arquivo:
+            return arquivo.read().strip().encode() or None
+    except OSError:
+        return None
+
+def run_worker(endereco=None):
+    """Mantém BART e o modelo de embeddings carregados e atende pedidos por socket local"""
+    endereco = endereco or endereco_worker
+    chave = worker_key(criar=True)
+    if chave is None:
+        raise RuntimeError("Sem chave para o worker: defina NEURON_WORKER_CHAVE ou corrija o arquivo de chave")
+    load_summarization_model()
+    get_embedding_model()
+
+    with Listener(endereco, authkey=chave) as listener:
+        debug(f"Worker pronto em {endereco[0]}:{endereco[1]}")
+        while True:
+            try:
+                conexao = listener.accept()
+            except (AuthenticationError, EOFError, OSError) as e:
+                debug(f"Conexão recusada: {e}")
+                continue
+            # Um cliente que cai no meio de um pedido (ex.: Ctrl-C na execução) não derruba o worker
+            try:
+                with conexao as conn:
+                    if _atender(conn):
+                        debug("Worker encerrado.")
+                        return
+            except (OSError, EOFError) as e:
+                debug(f"Cliente desconectado durante o pedido ({type(e).__name__}). Aguardando a próxima conexão.")
+
+def _atender(conn):
+    """Atende os pedidos de uma conexão até ela fechar. Retorna True se o pedido foi de encerrar o worker"""
+    while True:
+        try:
+            pedido = conn.recv()
+        except EOFError:
+            return False
+
+        tipo = pedido.get('tipo')
+        try:
+            if tipo == 'resumir':
+                # Com 'parcial', cada lote concluído é enviado na hora (o cliente grava checkpoints)
+                enviar = (lambda posicoes, resumos: conn.send({'parcial': (posicoes, resumos)})) \
+                    if pedido.get('parcial') else None
+                textos = pd.DataFrame({'artigo_ingles': pedido['textos']})
+                resposta = {'ok': True, 'resultado': process_summaries(
+                    textos, prazo=pedido.get('prazo'), ao_concluir=enviar)}
+            elif tipo == 'embeddings':
+                resposta = {'ok': True, 'resultado': get_embedding_model(pedido.get('modelo')).encode(
+                    pedido['textos'], batch_size=tamanho_lote_embeddings, convert_to_numpy=True)}
+            elif tipo == 'encerrar':
+                conn.send({'ok': True, 'resultado': None})
+                return True
+            else:
+                resposta = {'ok': False, 'erro': f"Pedido desconhecido: {tipo}"}
+        except ConnectionError:
+            # Falha ao enviar um resultado parcial: o cliente foi embora
+            raise
+        except Exception as e:
+            resposta = {'ok': False, 'erro': str(e)}
+        conn.send(resposta)
+
+class WorkerClient:
+    """Cliente do worker residente"""
+
+    def __init__(self, endereco=None, chave=None):
+        self.endereco = endereco or endereco_worker
+        self._chave = chave or worker_key()
+        # Testa a conexão já, para cair nos modelos locais logo no início se o worker não estiver no ar
+        Client(self.endereco, authkey=self._chave).close()
+
+    def _pedir(self, tipo, textos=None, ao_concluir=None, **extras):
+        # Uma conexão por pedido: o worker atende uma conexão por vez, e segurá-la durante a execução
+        # inteira (tradução incluída) deixaria outra execução esperando até esta terminar
+        with Client(self.endereco, authkey=self._chave) as conn:
+            conn.send({'tipo': tipo, 'textos': textos, 'parcial': ao_concluir is not None, **extras})
+            resposta = conn.recv()
+            while 'parcial' in resposta:
+                ao_concluir(*resposta['parcial'])
+                resposta = conn.recv()
+        if not resposta['ok']:
+            raise RuntimeError(f"Erro no worker: {resposta['erro']}")
+        return resposta['resultado']
+
+    def summarize(self, textos, prazo=None, ao_concluir=None):
+        return self._pedir('resumir', list(textos), ao_concluir, prazo=prazo)
+
+    def embed(self, textos, modelo=None):
+        return self._pedir('embeddings', list(textos), modelo=modelo)
 
-def filter_high_similarity(df, similarity_df, threshold):
-    """Filtra artigos com alta similaridade"""
-    if similarity_df.empty:
-        debug("Matriz de similaridade vazia. Pulando filtragem.")
+    def shutdown(self):
+        self._pedir('encerrar')
+
+_worker = None
+
+def connect_worker():
+    """Conecta ao worker residente se ele estiver no ar; senão os modelos rodam neste processo"""
+    global _worker
+    _worker = None
+    chave = worker_key()
+    if chave is None:
+        return None
+    try:
+        _worker = WorkerClient(chave=chave)
+        debug("Usando worker residente para resumos e embeddings.")
+    except (OSError, EOFError, AuthenticationError) as e:
+        # Inclui chave diferente da do worker (ou outro processo ocupando a porta)
+        if not isinstance(e, ConnectionRefusedError):
+            debug(f"Worker residente indisponível ({type(e).__name__}: {e}). Usando modelos locais.")
+    return _worker
+
+def similar_pairs(embeddings, threshold, bloco=None):
+    """Pares (i, j), i < j, com similaridade do cosseno acima do limite.
+
+    Calcula a matriz em blocos de `bloco` x `bloco` (float32) só no triângulo superior e guarda apenas
+    os índices acima do limite, então a memória não cresce com N².
+    """
+    bloco = bloco or bloco_similaridade
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    embeddings = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+    n = len(embeddings)
+
+    pares_i, pares_j = [], []
+    for inicio_i in range(0, n, bloco):
+        linhas = embeddings[inicio_i:inicio_i + bloco]
+        for inicio_j in range(inicio_i, n, bloco):
+            acima = linhas @ embeddings[inicio_j:inicio_j + bloco].T > threshold
+            if inicio_i == inicio_j:
+                acima = np.triu(acima, k=1)
+            i, j = np.nonzero(acima)
+            pares_i.append(i + inicio_i)
+            pares_j.append(j + inicio_j)
+
+    if not pares_i:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(pares_i), np.concatenate(pares_j)
+
+def agrupar_duplicatas(pares, n):
+    """Agrupa as posições 0..n-1 ligadas por pares de duplicatas (union-find) e retorna os grupos com mais de um item"""
+    pai = list(range(n))
+
+    def raiz(x):
+        while pai[x] != x:
+            pai[x] = pai[pai[x]]  # Compressão de caminho
+            x = pai[x]
+        return x
+
+    for i, j in pares:
+        ri, rj = raiz(int(i)), raiz(int(j))
+        if ri != rj:
+            pai[max(ri, rj)] = min(ri, rj)
+
+    grupos = {}
+    for k in range(n):
+        grupos.setdefault(raiz(k), []).append(k)
+    return [grupo for grupo in grupos.values() if len(grupo) > 1]
+
+def prioridade_representante(df):
+    """Posição de cada linha na ordem de preferência: artigo mais longo, depois o publicado primeiro, depois a ordem do arquivo"""
+    n = len(df)
+    tamanho = df['Artigo'].fillna("").astype(str).str.len().to_numpy() if 'Artigo' in df else np.zeros(n)
+    if 'Publicado_em' in df:
+        data = pd.to_datetime(df['Publicado_em'], errors='coerce', utc=True)
+        # Datas ausentes ficam por último
+        data = data.fillna(pd.Timestamp.max.tz_localize('UTC')).to_numpy()
+    else:
+        data = np.zeros(n)
+
+    ordem = np.lexsort((np.arange(n), data, -tamanho))
+    prioridade = np.empty(n, dtype=int)
+    prioridade[ordem] = np.arange(n)
+    return prioridade
+
+def remover_duplicatas(df, pares, rotulo="similares"):
+    """Mantém um representante por grupo de duplicatas. `pares` são posições (não rótulos) de linhas de df"""
+    grupos = agrupar_duplicatas(pares, len(df))
+    if not grupos:
+        debug(f"Nenhum par de artigos {rotulo} encontrado.")
         return df
-        
+
+    prioridade = prioridade_representante(df)
+    remover = []
+    for grupo in grupos:
+        representante = min(grupo, key=lambda k: prioridade[k])
+        remover.extend(k for k in grupo if k != representante)
+
+    manter = np.ones(len(df), dtype=bool)
+    manter[remover] = False
+    debug(f"Removidos {len(remover)} artigos {rotulo} em {len(grupos)} grupos.")
+    return df[manter]
+
+def filter_high_similarity(df, column_name, threshold):
+    """Filtra artigos com alta similaridade entre os textos da coluna, mantendo um representante por grupo"""
+    # Verificar se há textos vazios
+    validos = df[column_name].apply(lambda x: isinstance(x, str) and bool(x.strip())).to_numpy()
+    if (~validos).any():
+        debug(f"Aviso: {int((~validos).sum())} textos vazios encontrados na coluna {column_name}")
+    if validos.sum() < 2:
+        debug("Textos insuficientes para calcular similaridade. Pulando filtragem.")
+        return df
+
     debug(f"Filtrando artigos com similaridade > {threshold}...")
-    
     try:
-        # Identificar pares de índices com similaridade maior que o threshold
-        high_similarity_pairs = similarity_df.stack() \
-            .reset_index() \
-            .rename(columns={0: 'similarity', 'level_0': 'idx1', 'level_1': 'idx2'})
-        
-        # Filtrar apenas pares onde a similaridade é maior que o limite e idx1 != idx2
-        high_similarity_pairs = high_similarity_pairs[
-            (high_similarity_pairs['similarity'] > threshold) & 
-            (high_similarity_pairs['idx1'] != high_similarity_pairs['idx2'])
-        ]
-        
-        if high_similarity_pairs.empty:
-            debug("Nenhum par com alta similaridade encontrado.")
-            return df
-            
-        # Inicializar um conjunto para armazenar índices a serem mantidos
-        to_keep = set(df.index)
-        
-        # Iterar sobre os pares de alta similaridade
-        for _, row in high_similarity_pairs.iterrows():
-            i, j = row['idx1'], row['idx2']
-            # Verificar se ambos os índices ainda estão no conjunto
-            if i in to_keep and j in to_keep:
-                # Seleciona aleatoriamente um dos dois índices para manter
-                to_remove = np.random.choice([i, j])
-                # Remove o índice selecionado para remoção do conjunto `to_keep`
-                to_keep.discard(to_remove)
-        
-        # Filtrar o DataFrame original com os índices a serem mantidos
-        filtered_df = df.loc[list(to_keep)]
-        
-        debug(f"Removidos {len(df) - len(filtered_df)} artigos similares.")
-        return filtered_df
+        embeddings = encode_texts(df.loc[validos, column_name].tolist())
+        i, j = similar_pairs(embeddings, threshold)
+
+        # Converte as posições entre os textos válidos em posições de df
+        posicoes = np.flatnonzero(validos)
+        return remover_duplicatas(df, zip(posicoes[i], posicoes[j]), rotulo="similares")
     except Exception as e:
         debug(f"Erro ao filtrar por similaridade: {e}")
         return df
 
+def filter_semantic_duplicates_pt(df, threshold):
+    """Remove artigos com o mesmo assunto comparando os originais em português com um modelo multilíngue"""
+    if len(df) < 2:
+        return df
+
+    debug(f"Procurando artigos em português com similaridade > {threshold}...")
+    try:
+        # Título + início do texto: o modelo só lê os primeiros tokens de qualquer forma
+        textos = (df['Título'].fillna("").astype(str) + ". " + df['Artigo'].fillna("").astype(str).str[:1000]).tolist() \
+            if 'Título' in df else df['Artigo'].fillna("").astype(str).str[:1000].tolist()
+        i, j = similar_pairs(encode_texts(textos, modelo_embeddings_multilingue), threshold)
+        return remover_duplicatas(df, zip(i, j), rotulo="com o mesmo assunto")
+    except Exception as e:
+        debug(f"Erro na deduplicação semântica em português: {e}")
+        return df
+
+### DUPLICATAS LEXICAIS (MINHASH) ###
+def shingles(texto, tamanho=None):
+    """Conjunto de hashes (crc32) das sequências de `tamanho` palavras do texto normalizado"""
+    tamanho = tamanho or tamanho_shingle
+    palavras = re.findall(r"\w+", texto.lower())
+    if len(palavras) < tamanho:
+        return {zlib.crc32(" ".join(palavras).encode("utf-8"))} if palavras else set()
+    return {zlib.crc32(" ".join(palavras[k:k + tamanho]).encode("utf-8")) for k in range(len(palavras) - tamanho + 1)}
+
+def minhash_signatures(textos, num_perm=None, semente=42):
+    """Assinaturas MinHash (uma linha por texto), com hashing multiply-shift em uint64"""
+    num_perm = num_perm or num_permutacoes
+    rng = np.random.default_rng(semente)
+    a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+    assinaturas = np.full((len(textos), num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+    with np.errstate(over="ignore"):
+        for i, texto in enumerate(textos):
+            conjunto = shingles(texto)
+            if not conjunto:
+                continue
+            x = np.fromiter(conjunto, dtype=np.uint64, count=len(conjunto))[:, None]
+            assinaturas[i] = ((a * x + b) >> np.uint64(32)).astype(np.uint32).min(axis=0)
+    return assinaturas
+
+def lsh_candidate_pairs(assinaturas, bandas=None):
+    """Pares (i, j) com pelo menos uma faixa da assinatura idêntica"""
+    bandas = bandas or bandas_lsh
+    linhas = assinaturas.shape[1] // bandas
+    pares = set()
+    for banda in range(bandas):
+        baldes = {}
+        trecho = assinaturas[:, banda * linhas:(banda + 1) * linhas]
+        for i, chave in enumerate(map(bytes, trecho)):
+            baldes.setdefault(chave, []).append(i)
+        for membros in baldes.values():
+            for k, i in enumerate(membros):
+                pares.update((i, j) for j in membros[k + 1:])
+    return pares
+
+def filter_lexical_duplicates(df, threshold=None):
+    """Remove artigos quase idênticos (título + texto em português) antes da tradução e do resumo"""
+    threshold = threshold or similaridade_lexical
+    if len(df) < 2:
+        return df
+
+    debug(f"Procurando artigos quase idênticos (Jaccard > {threshold})...")
+    try:
+        textos = (df['Título'].fillna("").astype(str) + " " + df['Artigo'].fillna("").astype(str)).tolist() \
+            if 'Título' in df else df['Artigo'].fillna("").astype(str).tolist()
+        assinaturas = minhash_signatures(textos)
+        vazios = (assinaturas == np.iinfo(np.uint32).max).all(axis=1)
+
+        # Confirma cada candidato com a fração de valores iguais nas assinaturas (estimativa do Jaccard)
+        pares = [(i, j) for i, j in lsh_candidate_pairs(assinaturas)
+                 if not vazios[i] and (assinaturas[i] == assinaturas[j]).mean() > threshold]
+        return remover_duplicatas(df, sorted(pares), rotulo="quase idênticos")
+    except Exception as e:
+        debug(f"Erro ao filtrar duplicatas lexicais: {e}")
+        return df
+
+### HISTÓRICO DE ENVIADOS ###
+class EmbeddingStore:
+    """Embeddings normalizados dos resumos enviados: matriz float32 em disco (memmap) + índice SQLite com link e data"""
+
+    def __init__(self, arquivo_vetores=None, arquivo_indice=None):
+        self.arquivo_vetores = arquivo_vetores or arquivo_embeddings_enviados
+        self._conn = sqlite3.connect(arquivo_indice or arquivo_indice_enviados)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS enviados (
+                posicao INTEGER PRIMARY KEY,
+                link TEXT UNIQUE,
+                data TEXT
+            )
+        """)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (chave TEXT PRIMARY KEY, valor TEXT)")
+        self._conn.commit()
+
+        linha = self._conn.execute("SELECT valor FROM meta WHERE chave = 'dimensao'").fetchone()
+        self.dimensao = int(linha[0]) if linha else None
+        self._conferir_tamanho()
+
+    def _conferir_tamanho(self):
+        """Descarta do índice linhas que não chegaram à matriz (execução interrompida no meio da escrita)"""
+        linhas_gravadas = 0
+        if self.dimensao and os.path.exists(self.arquivo_vetores):
+            linhas_gravadas = os.path.getsize(self.arquivo_vetores) // (4 * self.dimensao)
+        self._conn.execute("DELETE FROM enviados WHERE posicao >= ?", (linhas_gravadas,))
+        self._conn.commit()
+        self.total = linhas_gravadas
+
+    def _matriz(self):
+        if not self.total:
+            return np.zeros((0, self.dimensao or 0), dtype=np.float32)
+        return np.memmap(self.arquivo_vetores, dtype=np.float32, mode="r", shape=(self.total, self.dimensao))
+
+    @staticmethod
+    def _normalizar(embeddings):
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        normas = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(normas, 1e-12)
+
+    def adicionar(self, links, embeddings, data=None):
+        """Acrescenta os embeddings ao fim da matriz; links já registrados são ignorados"""
+        data = data or datetime.date.today().isoformat()
+        embeddings = self._normalizar(embeddings)
+        if self.dimensao is None:
+            self.dimensao = embeddings.shape[1]
+            self._conn.execute("INSERT INTO meta (chave, valor) VALUES ('dimensao', ?)", (str(self.dimensao),))
+
+        existentes = {l for (l,) in self._conn.execute("SELECT link FROM enviados")}
+        novos = [k for k, link in enumerate(links) if link not in existentes]
+        if not novos:
+            return 0
+
+        # Grava primeiro a matriz e depois o índice; se cair no meio, _conferir_tamanho acerta na próxima abertura
+        with open(self.arquivo_vetores, "ab") as f:
+            f.write(embeddings[novos].tobytes())
+        self._conn.executemany(
+            "INSERT INTO enviados (posicao, link, data) VALUES (?, ?, ?)",
+            [(self.total + n, links[k], data) for n, k in enumerate(novos)]
+        )
+        self._conn.commit()
+        self.total += len(novos)
+        return len(novos)
+
+    def _posicoes_janela(self, dias, hoje):
+        """Posições dos resumos enviados nos `dias` anteriores a hoje (a edição de hoje não conta)"""
+        limite = (hoje - datetime.timedelta(days=dias)).isoformat()
+        return np.array([p for (p,) in self._conn.execute(
+            "SELECT posicao FROM enviados WHERE data >= ? AND data < ? ORDER BY posicao", (limite, hoje.isoformat())
+        )], dtype=np.int64)
+
+    def buscar(self, embeddings, dias=None, bloco=None):
+        """Maior similaridade de cada embedding com o histórico da janela, e o link correspondente"""
+        dias = dias or dias_historico
+        bloco = bloco or bloco_historico
+        consultas = self._normalizar(embeddings)
+        melhores = np.full(len(consultas), -1.0, dtype=np.float32)
+        posicoes_melhores = np.full(len(consultas), -1, dtype=np.int64)
+
+        posicoes = self._posicoes_janela(dias, datetime.date.today())
+        if not len(posicoes) or not len(consultas):
+            return melhores, [None] * len(consultas)
+
+        # Multiplicação em blocos: só `bloco` linhas do histórico ficam em memória por vez
+        matriz = self._matriz()
+        for inicio_bloco in range(0, len(posicoes), bloco):
+            posicoes_bloco = posicoes[inicio_bloco:inicio_bloco + bloco]
+            similaridades = consultas @ np.asarray(matriz[posicoes_bloco]).T
+            k = similaridades.argmax(axis=1)
+            maiores = similaridades[np.arange(len(consultas)), k]
+            melhorou = maiores > melhores
+            melhores[melhorou] = maiores[melhorou]
+            posicoes_melhores[melhorou] = posicoes_bloco[k[melhorou]]
+
+        links = dict(self._conn.execute("SELECT posicao, link FROM enviados"))
+        return melhores, [links.get(p) for p in posicoes_melhores]
+
+    def evict(self, dias=None):
+        """Reescreve a matriz mantendo só os resumos dentro da janela"""
+        dias = dias or dias_historico
+        limite = (datetime.date.today() - datetime.timedelta(days=dias)).isoformat()
+        manter = [(p, link, data) for p, link, data in self._conn.execute(
+            "SELECT posicao, link, data FROM enviados WHERE data >= ? ORDER BY posicao", (limite,)
+        )]
+        removidos = self.total - len(manter)
+        if removidos <= 0:
+            return
+
+        temporario = self.arquivo_vetores + ".tmp"
+        with open(temporario, "wb") as f:
+            f.write(np.asarray(self._matriz()[[p for p, _, _ in manter]], dtype=np.float32).tobytes())
+        os.replace(temporario, self.arquivo_vetores)
+
+        self._conn.execute("DELETE FROM enviados")
+        self._conn.executemany(
+            "INSERT INTO enviados (posicao, link, data) VALUES (?, ?, ?)",
+            [(n, link, data) for n, (_, link, data) in enumerate(manter)]
+        )
+        self._conn.commit()
+        self.total = len(manter)
+        debug(f"Histórico de enviados: {removidos} resumos com mais de {dias} dias removidos")
+
+    def close(self):
+        self._conn.close()
+
+_historico = None
+
+def get_embedding_store():
+    """Retorna o histórico de enviados compartilhado, abrindo-o na primeira chamada"""
+    global _historico
+    if _historico is None:
+        _historico = EmbeddingStore()
+    return _historico
+
+def filter_previously_sent(df, column_name, threshold):
+    """Remove artigos parecidos com resumos enviados nos últimos dias"""
+    validos = df[column_name].apply(lambda x: isinstance(x, str) and bool(x.strip())).to_numpy()
+    if not validos.any():
+        return df
+
+    try:
+        embeddings = np.asarray(encode_texts(df.loc[validos, column_name].tolist()), dtype=np.float32)
+        maiores, links = get_embedding_store().buscar(embeddings)
+    except Exception as e:
+        debug(f"Erro ao consultar o histórico de enviados: {e}")
+        return df
+
+    repetidos = maiores > threshold
+    for link, parecido, nota in zip(df.loc[validos, 'Link'][repetidos], np.array(links, dtype=object)[repetidos], maiores[repetidos]):
+        debug(f"Já enviado: {link} (similaridade {round(float(nota), 3)} com {parecido})")
+    debug(f"Removidos {int(repetidos.sum())} artigos já enviados nos últimos {dias_historico} dias.")
+
+    manter = np.ones(len(df), dtype=bool)
+    manter[np.flatnonzero(validos)[repetidos]] = False
+    return df[manter]
+
+def record_sent(df):
+    """Registra no histórico de enviados as notícias que entraram na edição.
+
+    Chamado pelo writer depois de filtrar as notícias da newsletter, e não ao salvar o CSV: notícias que
+    ficam de fora da edição não podem bloquear as dos próximos dias. Os embeddings vêm do cache
+    (os mesmos textos já foram codificados em filter_previously_sent).
+    """
+    validos = df['Resumo_ingles'].apply(lambda x: isinstance(x, str) and bool(x.strip())).to_numpy()
+    if not validos.any():
+        return
+    try:
+        embeddings = encode_texts(df.loc[validos, 'Resumo_ingles'].tolist())
+        novos = get_embedding_store().adicionar(df.loc[validos, 'Link'].tolist(), embeddings)
+        debug(f"Histórico de enviados: {novos} resumos registrados")
+    except Exception as e:
+        debug(f"Erro ao registrar resumos no histórico: {e}")
+
+def close_sent_history():
+    """Expira e fecha o histórico de enviados e os caches de embeddings abertos"""
+    global _historico
+    for cache in _caches_embeddings.values():
+        cache.relatorio()
+        cache.evict()
+        cache.close()
+    _caches_embeddings.clear()
+    if _historico is not None:
+        _historico.evict()
+        _historico.close()
+        _historico = None
+
 def translate_back_to_pt(text):
     """Traduz o resumo de inglês para português"""
     if not isinstance(text, str) or not text.strip():
         return ""
         
     try:
-        return GoogleTranslator(source='en', target='pt').translate(text)
+        return translate_articles([text], 'en', 'pt')[0]
     except Exception as e:
         debug(f"Erro ao traduzir de volta para português: {e}")
         return ""
 
 def process_reverse_translations(df):
-    """Processa todas as traduções de volta para português"""
-    pt_translations = []
-    total = len(df)
-    
-    for i, text in enumerate(df['Resumo_ingles']):
-        try:
-            translated = translate_back_to_pt(text)
-            pt_translations.append(translated)
-            progress = ((i + 1) / total) * 100
-            debug(f"Progresso da tradução PT: {round(progress, 2)}% ({i+1}/{total})")
-        except Exception as e:
-            debug(f"Erro ao traduzir texto {i} para PT: {e}")
-            pt_translations.append("")
-    
-    return pt_translations
+    """Processa todas as traduções de volta para português, vários resumos por requisição"""
+    debug(f"Traduzindo {len(df)} resumos...")
+    try:
+        return translate_articles(list(df['Resumo_ingles']), 'en', 'pt')
+    except Exception as e:
+        debug(f"Erro ao traduzir resumos para PT: {e}")
+        return [""] * len(df)
+
+### CHECKPOINTS ###
+class CheckpointStore:
+    """Resultados por artigo de uma etapa, em um arquivo JSONL só de acréscimos, chaveados pelo hash de (configuração, texto)"""
+
+    def __init__(self, etapa, config, pasta=None):
+        pasta = pasta or pasta_checkpoints
+        os.makedirs(pasta, exist_ok=True)
+        self.etapa = etapa
+        self.arquivo = os.path.join(pasta, f"{etapa}.jsonl")
+        self._config = json.dumps(config, sort_keys=True)
+        self._resultados = {}
+        if os.path.exists(self.arquivo):
+            with open(self.arquivo, encoding="utf-8") as f:
+                for linha in f:
+                    try:
+                        registro = json.loads(linha)
+                    except json.JSONDecodeError:
+                        continue  # Última linha cortada por uma execução interrompida
+                    self._resultados[registro['chave']] = registro
+        self._arquivo = open(self.arquivo, "a", encoding="utf-8")
+
+    def _chave(self, text):
+        return hashlib.sha256(f"{self._config}\x1f{text}".encode("utf-8")).hexdigest()
+
+    def get(self, text):
+        registro = self._resultados.get(self._chave(text))
+        return registro['resultado'] if registro else None
+
+    def put_many(self, pares):
+        """Grava pares (texto, resultado) e força a escrita no disco; resultados vazios são ignorados"""
+        agora = time.time()
+        for text, resultado in pares:
+            if not resultado:
+                continue
+            registro = {'chave': self._chave(text), 'resultado': resultado, 'gravado_em': agora}
+            self._resultados[registro['chave']] = registro
+            self._arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        self._arquivo.flush()
+        os.fsync(self._arquivo.fileno())
+
+    def evict(self, dias=None):
+        """Reescreve o arquivo só com os resultados recentes"""
+        dias = dias or dias_checkpoints
+        limite = time.time() - dias * 86400
+        manter = [r for r in self._resultados.values() if r['gravado_em'] >= limite]
+        if len(manter) == len(self._resultados):
+            return
+        self._arquivo.close()
+        temporario = self.arquivo + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            for registro in manter:
+                f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        os.replace(temporario, self.arquivo)
+        self._resultados = {r['chave']: r for r in manter}
+        self._arquivo = open(self.arquivo, "a", encoding="utf-8")
+
+    def close(self):
+        self._arquivo.close()
+
+_checkpoints = {}
+
+def run_checkpointed(etapa, config, textos, funcao, bloco=None, em_fluxo=False):
+    """Aplica funcao (lista de textos -> lista de resultados) só aos textos sem resultado salvo para a configuração,
+    em blocos de `bloco` artigos, gravando cada bloco assim que termina.
+
+    Com em_fluxo=True, funcao(textos, gravar) recebe todos os textos pendentes em uma única chamada e chama
+    gravar(posicoes, resultados) a cada resultado pronto (posições relativas à lista recebida). Assim etapas
+    com estado próprio (orçamento de tempo, processos com o modelo carregado) atravessam a execução inteira.
+    """
+    bloco = bloco or artigos_por_checkpoint
+    if etapa not in _checkpoints:
+        _checkpoints[etapa] = CheckpointStore(etapa, config)
+    store = _checkpoints[etapa]
+
+    textos = list(textos)
+    resultados = [store.get(text) if isinstance(text, str) and text.strip() else "" for text in textos]
+    faltando = [k for k, resultado in enumerate(resultados) if resultado is None]
+    if len(faltando) < len(textos):
+        debug(f"Checkpoint '{etapa}': {len(textos) - len(faltando)} de {len(textos)} artigos já processados")
+
+    if em_fluxo:
+        def gravar(posicoes, novos):
+            for p, resultado in zip(posicoes, novos):
+                resultados[faltando[p]] = resultado
+            store.put_many((textos[faltando[p]], resultado) for p, resultado in zip(posicoes, novos))
+
+        if faltando:
+            funcao([textos[k] for k in faltando], gravar)
+        return [resultado if resultado is not None else "" for resultado in resultados]
+
+    for inicio_bloco in range(0, len(faltando), bloco):
+        posicoes = faltando[inicio_bloco:inicio_bloco + bloco]
+        novos = funcao([textos[k] for k in posicoes])
+        for k, resultado in zip(posicoes, novos):
+            resultados[k] = resultado
+        store.put_many((textos[k], resultados[k]) for k in posicoes)
+    return resultados
+
+def summarize_texts(textos, ao_concluir=None, prazo=None):
+    """Resume uma lista de textos no worker residente, se estiver no ar, ou localmente.
+    `ao_concluir(posicoes, resumos)` recebe os resumos conforme ficam prontos"""
+    if _worker is not None:
+        return _worker.summarize(textos, prazo, ao_concluir)
+    if processos_resumo > 1:
+        return process_summaries_parallel(textos, ao_concluir=ao_concluir)
+    load_summarization_model()
+    return process_summaries(pd.DataFrame({'artigo_ingles': textos}), prazo=prazo, ao_concluir=ao_concluir)
 
 def main():
     try:
@@ -278,45 +1596,76 @@ def main():
         df = load_data()
         nmr_noticias = len(df)
         debug(f"Processando {nmr_noticias} notícias")
+
+        # Descartar cópias do mesmo texto (ex.: a mesma matéria em várias tags) antes de traduzir
+        df = filter_lexical_duplicates(df)
+
+        # Modelos no worker residente, se estiver no ar
+        connect_worker()
+
+        # Descartar notícias sobre o mesmo assunto ainda em português (opcional)
+        if dedup_portugues:
+            df = filter_semantic_duplicates_pt(df, threshold=similaridade)
         
         # Traduzir artigos para inglês
         debug("Iniciando tradução para inglês...")
-        df['artigo_ingles'] = process_translations(df)
-        
-        # Carregar modelo de resumo
-        debug("Carregando modelo de resumo...")
-        global tokenizer, model_large
-        tokenizer = BartTokenizer.from_pretrained("facebook/bart-large-cnn")
-        model_large = BartForConditionalGeneration.from_pretrained("facebook/bart-large-cnn")
+        df['artigo_ingles'] = run_checkpointed(
+            "traducao", {'backend': backend_traducao, 'direcao': "pt-en"}, df['Artigo'],
+            lambda textos: process_translations(pd.DataFrame({'Artigo': textos}))
+        )
         
-        # Resumir textos em inglês
+        # Resumir textos em inglês (no worker residente, se estiver no ar)
         debug("Iniciando resumo dos textos...")
-        df["Resumo_ingles"] = process_summaries(df)
+        # Prazo único para a etapa inteira: todos os textos pendentes vão em uma chamada, que carrega
+        # o nível de qualidade atual de um lote para o outro e faz um único relatório no final
+        prazo = time.time() + orcamento_resumo if orcamento_resumo else None
+        df["Resumo_ingles"] = run_checkpointed(
+            "resumo", {'modelo': modelo_resumo, 'backend': backend_resumo, 'min_tokens': min_tokens,
+                       'max_tokens': max_tokens, 'orcamento': orcamento_resumo},
+            df['artigo_ingles'], lambda textos, gravar: summarize_texts(textos, gravar, prazo), em_fluxo=True
+        )
         
-        # Calcular similaridade entre resumos
+        # Filtrar artigos com resumos similares
         debug("Calculando similaridade entre resumos...")
-        similarity_matrix = compute_cosine_similarity(df, 'Resumo_ingles')
-        
-        # Filtrar artigos similares
-        debug("Filtrando artigos similares...")
-        df_filtered = filter_high_similarity(df, similarity_matrix, threshold=similaridade)
+        df_filtered = filter_high_similarity(df, 'Resumo_ingles', threshold=similaridade)
+
+        # Remover notícias que já saíram em edições anteriores
+        debug("Comparando com resumos enviados nos últimos dias...")
+        df_filtered = filter_previously_sent(df_filtered, 'Resumo_ingles', threshold=similaridade)
         
         # Traduzir resumos de volta para português
         debug("Traduzindo resumos para português...")
-        df_filtered['Resumo'] = process_reverse_translations(df_filtered)
+        df_filtered['Resumo'] = run_checkpointed(
+            "volta", {'backend': backend_traducao, 'direcao': "en-pt"}, df_filtered['Resumo_ingles'],
+            lambda textos: process_reverse_translations(pd.DataFrame({'Resumo_ingles': textos}))
+        )
         
         # Salvar resultados
         debug("Salvando resultados...")
         df_filtered.to_csv("Notícias_Resumidas.csv", index=False)
         debug(f"Arquivo salvo com {len(df_filtered)} notícias resumidas e filtradas")
+        # O histórico de enviados é gravado pelo writer, só com as notícias que entram na edição
         
         debug("Processamento concluído com sucesso!")
         
     except Exception as e:
         debug(f"Erro no processamento principal: {e}")
+    finally:
+        memoria = get_translation_memory()
+        memoria.relatorio()
+        memoria.evict()
+        for store in _checkpoints.values():
+            store.evict()
+            store.close()
+        close_sent_history()
 
 if __name__ == "__main__":
-    main()
+    inicio = datetime.datetime.now()
+    configurar_locale()
+    if "--worker" in sys.argv:
+        run_worker()
+    else:
+        main()
     
-fim = datetime.datetime.now()
-print(f"Demorou: {fim - inicio}")
\ No newline at end of file
+    fim = datetime.datetime.now()
+    print(f"Demorou: {fim - inicio}")
\ No newline at end of file
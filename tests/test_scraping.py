@@ -0,0 +1,213 @@
+import contextlib
+import datetime
+import functools
+import http.server
+import socket
+import threading
+from pathlib import Path
+
+import pytest
+
+import scraping
+
+PASTA_FIXTURES = Path(__file__).resolve().parent / "fixtures" / "moneytimes"
+
+
+class _SemLog(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servidor():
+    """Servidor HTTP local com as páginas salvas do moneytimes"""
+    handler = functools.partial(_SemLog, directory=str(PASTA_FIXTURES))
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = scraping.ResponseCache(str(tmp_path / "cache"))
+    yield cache
+    cache.close()
+
+
+def test_artigo_estatico_extraido_via_http(servidor, cache):
+    limiter = scraping.HostLimiter(taxa_inicial=100, rajada=10)
+    resultado, = scraping.fetch_articles_http([f"{servidor}/artigo.html"], cache=cache, limiter=limiter)
+
+    assert resultado['Data'] == "08 maio 2025, 16:10"
+    assert resultado['Artigo'].split("\n") == [
+        "O Ibovespa encerrou a sessão desta quinta-feira em alta de 1,2%, aos 133 mil pontos.",
+        "As ações da Petrobras subiram mais de 3% após a divulgação do balanço trimestral.",
+        "No câmbio, o dólar recuou 0,8% frente ao real, cotado a R$ 5,64.",
+    ]
+    assert cache.get(f"{servidor}/artigo.html") is not None
+    assert sum(m['requisicoes'] for m in limiter.metricas().values()) == 1
+
+
+def test_pagina_com_javascript_vai_para_o_navegador(servidor, cache):
+    resultado, = scraping.fetch_articles_http([f"{servidor}/artigo_js.html"], cache=cache,
+                                              limiter=scraping.HostLimiter(taxa_inicial=100))
+    assert resultado is None
+
+
+def test_artigo_inexistente_e_link_invalido(servidor, cache):
+    limiter = scraping.HostLimiter(taxa_inicial=100, rajada=10)
+    ausente, invalido = scraping.fetch_articles_http([f"{servidor}/nao-existe.html", "javascript:void(0)"],
+                                                     cache=cache, limiter=limiter)
+    # Falhas definitivas: não seguram o watermark da seção
+    assert ausente == {'Data': None, 'Artigo': None, 'definitivo': True}
+    assert invalido == {'Data': None, 'Artigo': None, 'definitivo': True}
+
+
+def test_segunda_coleta_usa_o_cache(servidor, cache):
+    link = f"{servidor}/artigo.html"
+    limiter = scraping.HostLimiter(taxa_inicial=100, rajada=10)
+    primeiro, = scraping.fetch_articles_http([link], cache=cache, limiter=limiter)
+    segundo, = scraping.fetch_articles_http([link], cache=cache, limiter=limiter)
+
+    assert segundo == primeiro
+    assert sum(m['requisicoes'] for m in limiter.metricas().values()) == 1
+
+
+def test_html_sem_texto_nao_vai_para_o_cache_e_o_navegador_renderiza(servidor, cache, monkeypatch):
+    link = f"{servidor}/artigo_js.html"
+    resultado, = scraping.fetch_articles_http([link], cache=cache, limiter=scraping.HostLimiter(taxa_inicial=100))
+    assert resultado is None
+    assert cache.get(link) is None
+
+    # Uma cópia bruta deixada no cache (ex.: por uma versão anterior) também não impede o navegador
+    cache.put(link, (PASTA_FIXTURES / "artigo_js.html").read_text(encoding="utf-8"))
+    renderizado = (PASTA_FIXTURES / "artigo.html").read_text(encoding="utf-8")
+    carregadas = []
+
+    def load_page_source(driver, url, xpath_espera):
+        carregadas.append(url)
+        return renderizado
+
+    class Pool:
+        def driver(self):
+            return contextlib.nullcontext(object())
+
+    monkeypatch.setattr(scraping, "get_cache", lambda: cache)
+    monkeypatch.setattr(scraping, "load_page_source", load_page_source)
+
+    artigo = scraping.scrape_article_selenium(link, Pool())
+    assert carregadas == [link]
+    assert artigo['Data'] == "08 maio 2025, 16:10"
+
+    # Agora a versão renderizada está no cache e é reaproveitada
+    assert scraping.scrape_article_selenium(link, Pool()) == artigo
+    assert carregadas == [link]
+
+
+def test_replay_nao_altera_o_indice(cache, tmp_path, monkeypatch):
+    link = "https://www.moneytimes.com.br/ibovespa-fecha-em-alta-puxado-por-petrobras/"
+    cache.put(link, (PASTA_FIXTURES / "artigo.html").read_text(encoding="utf-8"))
+    monkeypatch.setattr(scraping, "MODO_REPLAY", True)
+    monkeypatch.setattr(scraping, "get_cache", lambda: cache)
+    indice = scraping.ArticleIndex(str(tmp_path / "indice.sqlite"))
+
+    df, falhas = scraping.scrape_articles(scraping.pd.DataFrame({'Link': [link]}), indice=indice)
+
+    assert df['Data'].tolist() == ["08 maio 2025, 16:10"]
+    assert not falhas
+    assert indice.buscar([link]) == {}
+    indice.close()
+
+
+def test_falha_de_conexao_faz_o_host_recuar(cache):
+    # Porta sem servidor: conexão recusada (aiohttp.ClientError)
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        porta = sock.getsockname()[1]
+
+    limiter = scraping.HostLimiter(taxa_inicial=4, rajada=10)
+    resultado, = scraping.fetch_articles_http([f"http://127.0.0.1:{porta}/artigo.html"], cache=cache, limiter=limiter)
+
+    assert resultado is None
+    metricas, = limiter.metricas().values()
+    assert metricas['erros'] == 1
+    assert metricas['taxa_atual'] < 4
+
+
+def test_datas_relativas_usam_o_momento_do_download(monkeypatch):
+    html = (PASTA_FIXTURES / "listagem.html").read_text(encoding="utf-8")
+    obtido_em = datetime.datetime(2025, 5, 8, 16, 0)
+    monkeypatch.setattr(scraping, "load_page", lambda *args, **kwargs: (html, obtido_em))
+
+    df, completa, obtida_em = scraping.crawl_listing("https://www.moneytimes.com.br/tag/empresas/", "moneytimes", "Empresas")
+
+    # A mesma página em cache dá o mesmo resultado, não importa quando é lida
+    assert completa
+    assert obtida_em == obtido_em
+    assert df['Publicado_em'].tolist() == ["2025-05-08T15:50", "2025-05-08T14:00"]
+    assert df['Link'].iloc[0] == "https://www.moneytimes.com.br/ibovespa-fecha-em-alta-puxado-por-petrobras/"
+
+
+def test_listagem_do_cache_limita_o_watermark(cache, monkeypatch):
+    url = "https://www.moneytimes.com.br/tag/empresas/"
+    cache.put(url, (PASTA_FIXTURES / "listagem.html").read_text(encoding="utf-8"))
+    # Cópia da página 1 baixada há 10 minutos, ainda dentro do TTL da listagem
+    with cache._lock:
+        cache._conn.execute("UPDATE respostas SET obtido_em = obtido_em - 600 WHERE chave = ?", (cache._chave(url),))
+        cache._conn.commit()
+    monkeypatch.setattr(scraping, "get_cache", lambda: cache)
+
+    inicio = datetime.datetime.now()
+    df, completa, obtida_em = scraping.crawl_listing(url, "moneytimes", "Empresas")
+
+    # O que foi publicado depois da cópia não está na listagem: o watermark não pode passar dela
+    assert completa and not df.empty
+    assert obtida_em <= inicio - datetime.timedelta(minutes=9)
+
+
+def test_listagem_com_erro_nao_e_completa(monkeypatch):
+    def load_page(*args, **kwargs):
+        raise scraping.TimeoutException("demorou")
+
+    monkeypatch.setattr(scraping, "load_page", load_page)
+    df, completa, _ = scraping.crawl_listing("https://www.moneytimes.com.br/tag/empresas/", "moneytimes", "Empresas")
+    assert df.empty
+    assert not completa
+
+
+def test_falha_no_aquecimento_nao_derruba_o_pool(monkeypatch):
+    abertos, fechados = [], []
+
+    class Driver:
+        def quit(self):
+            fechados.append(self)
+
+    def setup_driver():
+        if abertos:
+            raise RuntimeError("chromedriver indisponível")
+        abertos.append(Driver())
+        return abertos[-1]
+
+    monkeypatch.setattr(scraping, "setup_driver", setup_driver)
+    pool = scraping.DriverPool(tamanho=3)
+    pool.aquecer()
+
+    # A vaga do navegador que falhou foi liberada e o já aberto é fechado com o pool
+    assert pool._criados == 1
+    pool.close()
+    assert fechados == abertos
+
+
+def test_watermark_por_secao(tmp_path):
+    indice = scraping.ArticleIndex(str(tmp_path / "indice.sqlite"))
+    geral = datetime.datetime(2025, 5, 7, 8, 0)
+    indice.set_watermark(geral)
+    indice.set_watermark(datetime.datetime(2025, 5, 8, 8, 0), "Empresas")
+
+    assert indice.get_watermark("Empresas") == datetime.datetime(2025, 5, 8, 8, 0)
+    # Seções sem watermark próprio continuam do watermark geral antigo
+    assert indice.get_watermark("Bitcoin") == geral
+    indice.close()
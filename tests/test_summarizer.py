@@ -0,0 +1,205 @@
+import datetime
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import summarizer
+
+
+@pytest.fixture
+def checkpoints(tmp_path, monkeypatch):
+    """Checkpoints em uma pasta temporária, sem stores abertos de outros testes"""
+    monkeypatch.setattr(summarizer, "pasta_checkpoints", str(tmp_path / "checkpoints"))
+    monkeypatch.setattr(summarizer, "_checkpoints", {})
+    yield tmp_path / "checkpoints"
+    for store in summarizer._checkpoints.values():
+        store.close()
+
+
+### MARCADORES E BLOCOS DA TRADUÇÃO ###
+def test_marcadores_ida_e_volta():
+    segmentos = ["Primeiro parágrafo.", "Segundo, com [colchetes] e #.", "Terceiro"]
+    juntos = summarizer.join_with_markers(segmentos)
+    assert summarizer.split_markers(juntos, len(segmentos)) == segmentos
+
+    # O tradutor costuma mexer nos espaços do marcador e nas quebras de linha
+    traduzido = "[ # 0 ]\nFirst paragraph.\n[#1]  Second, with\n[brackets] and #.\n[# 2]\nThird"
+    assert summarizer.split_markers(traduzido, 3) == ["First paragraph.", "Second, with [brackets] and #.", "Third"]
+
+
+def test_marcador_perdido_devolve_none():
+    assert summarizer.split_markers("[#0]\nUm\nDois", 2) is None
+    assert summarizer.split_markers("[#1]\nDois\n[#0]\nUm", 2) is None
+    assert summarizer.split_markers("Texto solto\n[#0]\nUm", 1) is None
+    assert summarizer.split_markers(None, 1) is None
+
+
+def test_blocos_respeitam_o_limite_e_a_ordem():
+    segmentos = ["a" * 30, "b" * 50, "c" * 10, "d" * 120, "e" * 5]
+    blocos = summarizer.pack_segments(segmentos, 100)
+
+    assert [i for bloco in blocos for i in bloco] == list(range(len(segmentos)))
+    for bloco in blocos:
+        juntos = summarizer.join_with_markers([segmentos[i] for i in bloco])
+        # Um segmento maior que o limite fica sozinho no bloco
+        assert len(bloco) == 1 or len(juntos) <= 100
+
+
+def test_paragrafo_longo_quebrado_em_frases_inteiras():
+    paragrafo = "O Ibovespa subiu. As ações da Petrobras avançaram 3%. O dólar caiu frente ao real. Fim."
+    partes = summarizer.split_long_paragraph(paragrafo, 40)
+    assert all(len(parte) <= 40 for parte in partes)
+    assert " ".join(partes) == paragrafo
+
+
+### CHECKPOINTS ###
+def test_checkpoint_persiste_e_depende_da_configuracao(checkpoints):
+    store = summarizer.CheckpointStore("resumo", {'modelo': "a"})
+    store.put_many([("texto 1", "resumo 1"), ("texto 2", "")])
+    store.close()
+
+    # Última linha cortada por uma execução interrompida
+    with open(checkpoints / "resumo.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"chave": "incompl')
+
+    reaberto = summarizer.CheckpointStore("resumo", {'modelo': "a"})
+    assert reaberto.get("texto 1") == "resumo 1"
+    assert reaberto.get("texto 2") is None  # Resultados vazios não são gravados
+    reaberto.close()
+
+    outra_config = summarizer.CheckpointStore("resumo", {'modelo': "b"})
+    assert outra_config.get("texto 1") is None
+    outra_config.close()
+
+
+def test_retomada_em_blocos_pula_o_que_ja_foi_processado(checkpoints):
+    textos = [f"artigo {k}" for k in range(5)] + [""]
+    chamadas = []
+
+    def falha_no_segundo_bloco(lote):
+        chamadas.append(list(lote))
+        if len(chamadas) == 2:
+            raise RuntimeError("interrompido")
+        return [text.upper() for text in lote]
+
+    with pytest.raises(RuntimeError):
+        summarizer.run_checkpointed("traducao", {}, textos, falha_no_segundo_bloco, bloco=2)
+    summarizer._checkpoints.pop("traducao").close()
+
+    chamadas.clear()
+
+    def traduz(lote):
+        chamadas.append(list(lote))
+        return [text.upper() for text in lote]
+
+    resultado = summarizer.run_checkpointed("traducao", {}, textos, traduz, bloco=2)
+    assert chamadas == [["artigo 2", "artigo 3"], ["artigo 4"]]
+    assert resultado == ["ARTIGO 0", "ARTIGO 1", "ARTIGO 2", "ARTIGO 3", "ARTIGO 4", ""]
+
+
+def test_retomada_em_fluxo_pula_o_que_ja_foi_gravado(checkpoints):
+    textos = [f"artigo {k}" for k in range(6)]
+
+    def interrompe_depois_de_um_lote(pendentes, gravar):
+        gravar([0, 1, 2], [text.upper() for text in pendentes[:3]])
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        summarizer.run_checkpointed("resumo", {}, textos, interrompe_depois_de_um_lote, em_fluxo=True)
+    summarizer._checkpoints.pop("resumo").close()
+
+    recebidos = []
+
+    def resume(pendentes, gravar):
+        recebidos.extend(pendentes)
+        # Os lotes voltam fora de ordem, como no resumo paralelo
+        gravar([2, 0], [pendentes[2].upper(), pendentes[0].upper()])
+        gravar([1], [pendentes[1].upper()])
+
+    resultado = summarizer.run_checkpointed("resumo", {}, textos, resume, em_fluxo=True)
+    assert recebidos == ["artigo 3", "artigo 4", "artigo 5"]
+    assert resultado == [text.upper() for text in textos]
+
+    linhas = (checkpoints / "resumo.jsonl").read_text(encoding="utf-8").splitlines()
+    assert len(linhas) == 6 and all(json.loads(linha)['resultado'] for linha in linhas)
+
+
+### DUPLICATAS ###
+def test_grupos_de_duplicatas():
+    grupos = summarizer.agrupar_duplicatas([(0, 3), (3, 5), (1, 2)], 7)
+    assert sorted(sorted(grupo) for grupo in grupos) == [[0, 3, 5], [1, 2]]
+    assert summarizer.agrupar_duplicatas([], 3) == []
+
+
+def test_representante_deterministico():
+    df = pd.DataFrame({
+        'Link': ["curto", "longo-tarde", "longo-cedo", "longo-cedo-2", "sem-data"],
+        'Artigo': ["x" * 10, "x" * 50, "x" * 50, "x" * 50, "x" * 50],
+        'Publicado_em': ["2025-05-08T10:00", "2025-05-08T12:00", "2025-05-08T09:00", "2025-05-08T09:00", None],
+    })
+    pares = [(0, 1), (1, 2), (2, 3), (3, 4)]
+
+    # Mais longo, depois o publicado primeiro, depois a ordem do arquivo
+    assert summarizer.remover_duplicatas(df, pares)['Link'].tolist() == ["longo-cedo"]
+
+    # O mesmo grupo em outra ordem escolhe o mesmo artigo quando o desempate não depende da posição
+    embaralhado = df.iloc[[4, 1, 0, 2]].reset_index(drop=True)
+    assert summarizer.remover_duplicatas(embaralhado, [(0, 1), (1, 2), (2, 3)])['Link'].tolist() == ["longo-cedo"]
+
+
+def test_minhash_encontra_quase_identicos():
+    base = ("O Ibovespa encerrou a sessão desta quinta-feira em alta de 1,2%, aos 133 mil pontos, "
+            "puxado pelas ações da Petrobras, que subiram mais de 3% após a divulgação do balanço trimestral "
+            "da companhia, enquanto o dólar recuou 0,8% frente ao real e fechou cotado a R$ 5,64.")
+    textos = [base, base + " Atualizado às 18h.", "O bitcoin voltou a superar os 100 mil dólares nesta sexta-feira."]
+
+    assinaturas = summarizer.minhash_signatures(textos)
+    assert np.array_equal(assinaturas, summarizer.minhash_signatures(textos))
+    assert (0, 1) in summarizer.lsh_candidate_pairs(assinaturas)
+    assert (assinaturas[0] == assinaturas[2]).mean() < 0.2
+
+    df = pd.DataFrame({'Título': ["Ibovespa sobe", "Ibovespa sobe", "Bitcoin"], 'Artigo': textos})
+    # Fica a versão mais longa da matéria repetida
+    assert summarizer.filter_lexical_duplicates(df, 0.7)['Artigo'].tolist() == [textos[1], textos[2]]
+
+
+def test_pares_similares_em_blocos_igual_a_matriz_densa():
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((50, 16)).astype(np.float32)
+    embeddings[40:] = embeddings[:10] + 0.05 * rng.standard_normal((10, 16)).astype(np.float32)
+
+    normalizados = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    esperados = set(zip(*np.nonzero(np.triu(normalizados @ normalizados.T > 0.9, k=1))))
+
+    i, j = summarizer.similar_pairs(embeddings, 0.9, bloco=7)
+    assert set(zip(i.tolist(), j.tolist())) == esperados
+    assert {(k, k + 40) for k in range(10)} <= esperados
+
+
+### HISTÓRICO DE ENVIADOS ###
+def test_historico_de_enviados(tmp_path):
+    vetores, indice = str(tmp_path / "enviados.f32"), str(tmp_path / "enviados.sqlite")
+    ontem = (datetime.date.today() - datetime.timedelta(days=1)).isoformat()
+    antigo = (datetime.date.today() - datetime.timedelta(days=30)).isoformat()
+    embeddings = np.eye(3, 4, dtype=np.float32) * 2
+
+    store = summarizer.EmbeddingStore(vetores, indice)
+    assert store.adicionar(["a", "b"], embeddings[:2], data=ontem) == 2
+    assert store.adicionar(["b", "c"], embeddings[1:], data=antigo) == 1  # "b" já estava registrado
+    assert store.adicionar(["d"], embeddings[2:], data=datetime.date.today().isoformat()) == 1
+
+    # Só entram os dias anteriores dentro da janela: "c" é antigo demais e "d" é da edição de hoje
+    maiores, links = store.buscar(embeddings, dias=7)
+    assert links == ["a", "b", "a"]
+    assert np.allclose(maiores, [1, 1, 0])
+    store.close()
+
+    # Matriz cortada no meio da escrita: o índice é ajustado ao que chegou ao disco
+    with open(vetores, "r+b") as f:
+        f.truncate(4 * 4 * 2 + 3)
+    reaberto = summarizer.EmbeddingStore(vetores, indice)
+    assert reaberto.total == 2
+    assert reaberto.adicionar(["c"], embeddings[2:], data=ontem) == 1
+    reaberto.close()
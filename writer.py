@@ -1,19 +1,19 @@
 import pandas as pd
-import yfinance as yf
 import locale
 from datetime import datetime, timedelta
 import random
 import time
 from pathlib import Path
 
-# Attempt to set locale for Portuguese Brazil date formatting
-try:
-    locale.setlocale(locale.LC_TIME, 'pt_BR.utf8')
-except:
+def configurar_locale():
+    """Attempt to set locale for Portuguese Brazil date formatting"""
     try:
-        locale.setlocale(locale.LC_TIME, 'Portuguese_Brazil.1252')  # Windows alternative
+        locale.setlocale(locale.LC_TIME, 'pt_BR.utf8')
     except:
-        print("Could not set Brazilian locale, using default")
+        try:
+            locale.setlocale(locale.LC_TIME, 'Portuguese_Brazil.1252')  # Windows alternative
+        except:
+            print("Could not set Brazilian locale, using default")
 
 # Lista de frases
 frases = [
@@ -25,9 +25,6 @@ frases = [
     # ... other phrases ...
 ]
 
-# Seleciona uma frase aleatória
-subtitulo = random.choice(frases)
-
 def contar_palavras(resumo):
     return len(resumo.split()) if isinstance(resumo, str) else 0
 
@@ -39,6 +36,8 @@ def calcular_tempo_economizado(df, coluna_tempo):
 
 def obter_fechamentos_com_retry():
     """Obter fechamentos com mecanismo de retry e valores default para casos de falha"""
+    import yfinance as yf  # Importado só aqui: é lento e nenhum outro caminho precisa dele
+
     tickers = {'IBOV': '^BVSP', 'BTC': 'BTC-USD', 'USD': 'BRL=X'}
     resultados = {}
     
@@ -110,6 +109,9 @@ def parse_custom_date(date_str):
 
 def gerar_html(df, resultados, minutos_leitura, segundos_leitura, minutos, segundos):
     """Gera o arquivo HTML da newsletter"""
+    # Seleciona uma frase aleatória
+    subtitulo = random.choice(frases)
+
     html = f"""
     <html>
     <head>
@@ -426,7 +428,19 @@ def gerar_html(df, resultados, minutos_leitura, segundos_leitura, minutos, segun
     print(f"Arquivo HTML gerado com sucesso: {filename}")
     return filename
 
+def registrar_enviados(df):
+    """Registra as notícias da edição no histórico de enviados do summarizer"""
+    if 'Resumo_ingles' not in df.columns or 'Link' not in df.columns:
+        print("Aviso: CSV sem as colunas 'Resumo_ingles' e 'Link'; histórico de enviados não atualizado.")
+        return
+    import summarizer  # Importado só aqui: os embeddings costumam vir do cache, sem carregar modelos
+    try:
+        summarizer.record_sent(df)
+    finally:
+        summarizer.close_sent_history()
+
 def main():
+    configurar_locale()
     try:
         # Verifica se o arquivo CSV existe
         csv_file = "Notícias_Resumidas.csv"
@@ -479,6 +493,9 @@ def main():
         # Gera o HTML
         arquivo_gerado = gerar_html(df, resultados, minutos_leitura, segundos_leitura, minutos, segundos)
         print(f"Processo concluído com sucesso! Arquivo gerado: {arquivo_gerado}")
+
+        # Só as notícias que entraram na edição contam como enviadas nos próximos dias
+        registrar_enviados(df)
         
     except Exception as e:
         print(f"Erro durante a execução: {e}")